@@ -1,12 +1,74 @@
 import argparse
+import math
 import sqlite3
 import json
+from pathlib import Path
+
 import numpy as np
 
 
+# Integer epoch-ms columns make latency a plain subtraction per row
+LATENCY_SQL = """
+    SELECT indexed_at_ms - ingested_at_ms AS latency_ms
+    FROM events
+    WHERE indexed_at_ms IS NOT NULL AND ingested_at_ms IS NOT NULL
+"""
+
+# Databases written before the epoch-ms columns existed only have ISO strings
+LEGACY_LATENCY_SQL = """
+    SELECT (julianday(indexed_at) - julianday(ingested_at)) * 86400000 AS latency_ms
+    FROM events
+    WHERE indexed_at IS NOT NULL AND ingested_at IS NOT NULL
+"""
+
+QUANTILES = (0.50, 0.90, 0.95, 0.99)
+FETCH_SIZE = 65536
+
+READ_PRAGMAS = (
+    "PRAGMA cache_size=-262144",    # 256 MiB page cache
+    "PRAGMA mmap_size=1073741824",  # serve scans from a 1 GiB memory map
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    """Open the database read-only with pragmas tuned for full-table scans."""
+    conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+    for pragma in READ_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def _latency_sql(cursor) -> str:
+    """Pick the latency query supported by this database's schema."""
+    cursor.execute("PRAGMA table_info(events)")
+    columns = {row[1] for row in cursor.fetchall()}
+    if {'ingested_at_ms', 'indexed_at_ms'} <= columns:
+        return LATENCY_SQL
+    return LEGACY_LATENCY_SQL
+
+
+def _load_latencies(cursor, latency_sql: str, count: int) -> np.ndarray:
+    """Stream latencies into a preallocated float64 array in fetchmany batches."""
+    latencies = np.empty(count, dtype=np.float64)
+    cursor.execute(latency_sql)
+    filled = 0
+    while True:
+        rows = cursor.fetchmany(FETCH_SIZE)
+        if not rows:
+            break
+        end = min(filled + len(rows), count)
+        latencies[filled:end] = [row[0] for row in rows[:end - filled]]
+        filled = end
+    return latencies[:filled]
+
+
 def compute_latencies(db_path: str, output_file: str = None):
     """
     Compute latency statistics.
+
+    Moments are computed inside SQLite; percentiles need the full
+    distribution, which is streamed into a single float64 array.
     
     Args:
         db_path: Path to SQLite database
@@ -14,34 +76,44 @@ def compute_latencies(db_path: str, output_file: str = None):
     """
     print(f"[*] Computing latencies from: {db_path}")
     
-    conn = sqlite3.connect(db_path)
+    conn = _connect(db_path)
     cursor = conn.cursor()
     
-    # Get latencies in milliseconds
-    cursor.execute("""
-        SELECT (julianday(indexed_at) - julianday(ingested_at)) * 86400000 as latency_ms
-        FROM events
-        WHERE indexed_at IS NOT NULL AND ingested_at IS NOT NULL
-    """)
+    latency_sql = _latency_sql(cursor)
     
-    latencies = [row[0] for row in cursor.fetchall()]
+    # Moments in one scan. Squares are summed around the first latency so the
+    # one-pass variance doesn't cancel when the mean dwarfs the spread
+    cursor.execute(f"SELECT latency_ms FROM ({latency_sql}) LIMIT 1")
+    first = cursor.fetchone()
+    shift = first[0] if first else 0.0
+    cursor.execute(f"""
+        SELECT COUNT(*), AVG(latency_ms), MIN(latency_ms), MAX(latency_ms),
+               SUM(latency_ms - ?), SUM((latency_ms - ?) * (latency_ms - ?))
+        FROM ({latency_sql})
+    """, (shift, shift, shift))
+    count, mean, min_latency, max_latency, sum_d, sum_d_sq = cursor.fetchone()
     
-    if not latencies:
+    if not count:
         print("[WARNING] No latency data found")
+        conn.close()
         return
     
+    latencies = _load_latencies(cursor, latency_sql, count)
+    # Partition the array in place instead of sorting a copy
+    p50, p90, p95, p99 = np.quantile(latencies, QUANTILES, overwrite_input=True)
+    
     # Compute percentiles
     percentiles = {
-        'count': len(latencies),
-        'mean': float(np.mean(latencies)),
-        'median': float(np.median(latencies)),
-        'std': float(np.std(latencies)),
-        'min': float(np.min(latencies)),
-        'max': float(np.max(latencies)),
-        'p50': float(np.percentile(latencies, 50)),
-        'p90': float(np.percentile(latencies, 90)),
-        'p95': float(np.percentile(latencies, 95)),
-        'p99': float(np.percentile(latencies, 99)),
+        'count': count,
+        'mean': float(mean),
+        'median': float(p50),
+        'std': math.sqrt(max(sum_d_sq / count - (sum_d / count) ** 2, 0.0)),
+        'min': float(min_latency),
+        'max': float(max_latency),
+        'p50': float(p50),
+        'p90': float(p90),
+        'p95': float(p95),
+        'p99': float(p99),
     }
     
     # Print results
@@ -1,19 +1,169 @@
 import argparse
 import csv
+import shutil
 import sqlite3
+import subprocess
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:  # optional: native CSV encoder for large exports
+    pa = None
+
+try:
+    import adbc_driver_sqlite.dbapi as adbc_sqlite
+except ImportError:  # optional: SQLite -> Arrow record batches without Python rows
+    adbc_sqlite = None
+
+
+FETCH_SIZE = 50000
+WRITE_BUFFER = 1 << 20
+
+
+READ_PRAGMAS = (
+    "PRAGMA cache_size=-262144",    # 256 MiB page cache
+    "PRAGMA mmap_size=1073741824",  # serve scans from a 1 GiB memory map
+    "PRAGMA temp_store=MEMORY",
+)
 
 
 def _connect(db_path: str) -> sqlite3.Connection:
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+    # Exports only read, so open read-only and skip write locking
+    conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+    for pragma in READ_PRAGMAS:
+        conn.execute(pragma)
+    # Plain tuples: `SELECT *` already yields columns in PRAGMA table_info order
     return conn
 
 
-def export_to_csv(db_path: str, output_csv: str, limit: int = 0) -> int:
+def _export_with_sqlite_cli(db_path: str, query: str, output_csv: str) -> Optional[int]:
+    """Let the sqlite3 shell encode the CSV in C.
+
+    Returns the number of rows written, or None if the shell is unavailable.
+    """
+    sqlite_bin = shutil.which("sqlite3")
+    if sqlite_bin is None:
+        print("⚠️  sqlite3 command-line shell not found, falling back to Python export")
+        return None
+
+    with open(output_csv, "wb") as fh:
+        subprocess.run(
+            [sqlite_bin, "-readonly", db_path, ".headers on", ".mode csv", query],
+            stdout=fh,
+            check=True,
+        )
+    return _count_csv_records(output_csv) - 1  # minus the header
+
+
+def _count_csv_records(path: str) -> int:
+    """Count the shell's CRLF record terminators; a bare LF inside a quoted field is not one."""
+    count = 0
+    prev = b""
+    with open(path, "rb") as fh:
+        while True:
+            chunk = fh.read(WRITE_BUFFER)
+            if not chunk:
+                break
+            count += chunk.count(b"\r\n") + (prev == b"\r" and chunk[:1] == b"\n")
+            prev = chunk[-1:]
+    return count
+
+
+def _write_rows_csv(cur: sqlite3.Cursor, cols: List[str], output_csv: str) -> int:
+    """Write the cursor's remaining rows with the stdlib csv writer."""
+    count = 0
+    with open(output_csv, "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER) as fh:
+        writer = csv.writer(fh)
+        writer.writerow(cols)
+        while True:
+            rows = cur.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            writer.writerows(rows)
+            count += len(rows)
+            print(f"  Exported {count:,} rows...")
+    return count
+
+
+def _arrow_write_options() -> "pacsv.WriteOptions":
+    # Header is written separately so every engine emits the same first line
+    return pacsv.WriteOptions(include_header=False, quoting_style="needed", eol="\r\n")
+
+
+def _arrow_column(values: tuple) -> "pa.Array":
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # SQLite columns may mix storage classes; encode those as text
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+
+def _write_rows_arrow(cur: sqlite3.Cursor, cols: List[str], output_csv: str) -> int:
+    """Write the cursor's remaining rows with pyarrow's CSV encoder.
+
+    Even with quoting_style="needed", Arrow quotes every non-null string
+    value and leaves numbers and nulls bare, while the csv module quotes
+    only fields containing a delimiter, quote or newline. The file is
+    therefore not byte-identical to the csv module's output, but it parses
+    to the same rows.
+    """
+    count = 0
+    with open(output_csv, "wb", buffering=WRITE_BUFFER) as fh:
+        fh.write(",".join(cols).encode("utf-8") + b"\r\n")
+        options = _arrow_write_options()
+        while True:
+            rows = cur.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            batch = pa.record_batch([_arrow_column(c) for c in zip(*rows)], names=cols)
+            pacsv.write_csv(batch, fh, write_options=options)
+            count += len(rows)
+            print(f"  Exported {count:,} rows...")
+    return count
+
+
+def _export_with_adbc(db_path: str, query: str, cols: List[str], output_csv: str) -> Optional[int]:
+    """Stream ADBC record batches straight into pyarrow's CSV encoder.
+
+    No Python row objects are created. Returns None if the driver cannot
+    type the result (e.g. a column mixing storage classes), in which case
+    the caller falls back to the row-based writers.
+    """
+    conn = adbc_sqlite.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro")
+    count = 0
+    try:
+        cur = conn.cursor()
+        cur.execute(query)
+        reader = cur.fetch_record_batch()
+        with open(output_csv, "wb", buffering=WRITE_BUFFER) as fh:
+            fh.write(",".join(cols).encode("utf-8") + b"\r\n")
+            with pacsv.CSVWriter(fh, reader.schema, write_options=_arrow_write_options()) as writer:
+                for batch in reader:
+                    writer.write_batch(batch)
+                    count += batch.num_rows
+                    print(f"  Exported {count:,} rows...")
+        cur.close()
+    except Exception as e:
+        print(f"⚠️  ADBC export failed ({e}), falling back to row-based export")
+        return None
+    finally:
+        conn.close()
+    return count
+
+
+def export_to_csv(db_path: str, output_csv: str, limit: int = 0, fast: bool = False) -> int:
     """Export rows from the `events` table to CSV.
 
+    Reads through `events_view` when the database has one, so enum columns
+    are written as names rather than integer codes.
+
+    With `fast=True` the CSV encoding is delegated to the sqlite3 shell
+    when it is installed. Otherwise, with pyarrow available, batches are
+    streamed through the ADBC SQLite driver when installed, or built from
+    fetched rows; the stdlib csv writer is the last resort.
+
     Returns the number of rows written.
     """
     print(f"📤 Exporting events from: {db_path}")
@@ -23,9 +173,16 @@ def export_to_csv(db_path: str, output_csv: str, limit: int = 0) -> int:
     # Ensure output directory exists
     Path(output_csv).parent.mkdir(parents=True, exist_ok=True)
 
+    # Pipeline databases store method/browser/os/ip_class as integer codes;
+    # their events_view decodes them back to names
+    has_view = cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'view' AND name = 'events_view'"
+    ).fetchone()
+    source = "events_view" if has_view else "events"
+
     # Get columns for events table
     try:
-        cur.execute("PRAGMA table_info(events)")
+        cur.execute(f"PRAGMA table_info({source})")
         cols = [r[1] for r in cur.fetchall()]
         if not cols:
             raise RuntimeError("Table 'events' not found or has no columns")
@@ -33,21 +190,30 @@ def export_to_csv(db_path: str, output_csv: str, limit: int = 0) -> int:
         conn.close()
         raise
 
-    query = "SELECT * FROM events"
+    query = f"SELECT * FROM {source}"
     if limit and limit > 0:
         query += f" LIMIT {int(limit)}"
 
+    if fast:
+        count = _export_with_sqlite_cli(db_path, query, output_csv)
+        if count is not None:
+            conn.close()
+            print(f"[OK] Exported {count:,} rows to: {output_csv}")
+            return count
+
+    if pa is not None and adbc_sqlite is not None:
+        count = _export_with_adbc(db_path, query, cols, output_csv)
+        if count is not None:
+            conn.close()
+            print(f"[OK] Exported {count:,} rows to: {output_csv}")
+            return count
+
     cur.execute(query)
 
-    count = 0
-    with open(output_csv, "w", newline="", encoding="utf-8") as fh:
-        writer = csv.writer(fh)
-        writer.writerow(cols)
-        for row in cur:
-            writer.writerow([row[c] for c in cols])
-            count += 1
-            if count % 10000 == 0:
-                print(f"  Exported {count:,} rows...")
+    if pa is not None:
+        count = _write_rows_arrow(cur, cols, output_csv)
+    else:
+        count = _write_rows_csv(cur, cols, output_csv)
 
     conn.close()
     print(f"[OK] Exported {count:,} rows to: {output_csv}")
@@ -72,25 +238,40 @@ def export_alerts(db_path: str, output_csv: str) -> int:
         # Fallback to a sensible header if table doesn't exist
         cols = ["id", "alert_type", "ip", "count", "window_start", "window_end", "created_at"]
 
-    cur.execute(f"SELECT * FROM alerts ORDER BY created_at DESC")
+    cur.execute("SELECT * FROM alerts ORDER BY created_at DESC")
 
+    # `SELECT *` rows are plain tuples already in `cols` order
     count = 0
-    with open(output_csv, "w", newline="", encoding="utf-8") as fh:
+    with open(output_csv, "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER) as fh:
         writer = csv.writer(fh)
         writer.writerow(cols)
-        for row in cur:
-            # row may be sqlite3.Row; ensure order matches cols
-            try:
-                writer.writerow([row[c] for c in cols])
-            except Exception:
-                writer.writerow(list(row))
-            count += 1
+        while True:
+            rows = cur.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            writer.writerows(rows)
+            count += len(rows)
 
     conn.close()
     print(f"[OK] Exported {count:,} alerts to: {output_csv}")
     return count
 
 
+SUMMARY_SQL = """
+    SELECT 'total', NULL, COUNT(*) FROM events
+    UNION ALL
+    SELECT * FROM (
+        SELECT 'status', status, COUNT(*) AS cnt FROM events
+        GROUP BY status ORDER BY cnt DESC LIMIT 10
+    )
+    UNION ALL
+    SELECT * FROM (
+        SELECT 'ip', ip, COUNT(*) AS cnt FROM events
+        GROUP BY ip ORDER BY cnt DESC LIMIT 50
+    )
+"""
+
+
 def export_summary(db_path: str, output_csv: str) -> int:
     """Write a small summary CSV with key/value pairs and a top-IP section.
 
@@ -102,44 +283,32 @@ def export_summary(db_path: str, output_csv: str) -> int:
 
     Path(output_csv).parent.mkdir(parents=True, exist_ok=True)
 
+    # One statement for all sections; each arm is answered from the
+    # idx_status / idx_ip indexes the pipeline creates on `events`
+    try:
+        cur.execute(SUMMARY_SQL)
+        results = cur.fetchall()
+    except sqlite3.Error:
+        results = []
+
+    total = next((r[2] for r in results if r[0] == "total"), 0)
+    sections = (("status", ["Status", "Count"]), ("ip", ["Top IP", "Count"]))
+
     rows_written = 0
     with open(output_csv, "w", newline="", encoding="utf-8") as fh:
         writer = csv.writer(fh)
 
-        # Total events
-        try:
-            cur.execute("SELECT COUNT(*) as cnt FROM events")
-            total = cur.fetchone()[0]
-        except Exception:
-            total = 0
         writer.writerow(["Total Events", total])
         rows_written += 1
 
-        # Events by status (top 10)
-        writer.writerow([])
-        writer.writerow(["Status", "Count"])
-        rows_written += 1
-        try:
-            cur.execute(
-                "SELECT status, COUNT(*) as cnt FROM events GROUP BY status ORDER BY cnt DESC LIMIT 10"
-            )
-            for r in cur.fetchall():
-                writer.writerow([r[0], r[1]])
-                rows_written += 1
-        except Exception:
-            pass
-
-        # Top IPs
-        writer.writerow([])
-        writer.writerow(["Top IP", "Count"])
-        rows_written += 1
-        try:
-            cur.execute("SELECT ip, COUNT(*) as cnt FROM events GROUP BY ip ORDER BY cnt DESC LIMIT 50")
-            for r in cur.fetchall():
-                writer.writerow([r[0], r[1]])
-                rows_written += 1
-        except Exception:
-            pass
+        for tag, header in sections:
+            writer.writerow([])
+            writer.writerow(header)
+            rows_written += 1
+            for r in results:
+                if r[0] == tag:
+                    writer.writerow([r[1], r[2]])
+                    rows_written += 1
 
     conn.close()
     print(f"[OK] Summary written to: {output_csv}")
@@ -152,6 +321,8 @@ def _parse_args() -> argparse.Namespace:
     p.add_argument("mode", choices=["events", "alerts", "summary"], help="Export mode")
     p.add_argument("out", help="Output CSV file path")
     p.add_argument("--limit", type=int, default=0, help="Limit number of rows when exporting events")
+    p.add_argument("--fast", action="store_true",
+                   help="Encode events CSV with the sqlite3 shell (falls back to Python if not installed)")
     return p.parse_args()
 
 
@@ -159,7 +330,7 @@ def main(argv: Optional[argparse.Namespace] = None) -> None:
     args = _parse_args() if argv is None else argv
 
     if args.mode == "events":
-        export_to_csv(args.db, args.out, limit=getattr(args, "limit", 0))
+        export_to_csv(args.db, args.out, limit=getattr(args, "limit", 0), fast=getattr(args, "fast", False))
     elif args.mode == "alerts":
         export_alerts(args.db, args.out)
     elif args.mode == "summary":
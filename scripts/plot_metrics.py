@@ -1,29 +1,225 @@
 import argparse
+import multiprocessing
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # files only; skip probing for an interactive GUI backend
 import matplotlib.pyplot as plt
-import seaborn as sns
 from pathlib import Path
 import glob
+import importlib.util
 import numpy as np
+from cycler import cycler
+from matplotlib.colors import to_hex
+from matplotlib.lines import Line2D
 
+try:
+    import datashader as ds
+    import datashader.transfer_functions as tf
+except ImportError:  # optional: O(pixels) rendering of very long traces
+    ds = None
 
-sns.set_style("whitegrid")
-sns.set_palette("husl")
 
+# seaborn's "whitegrid" style and 6-color "husl" palette, without importing seaborn
+HUSL_COLORS = ['#f77189', '#bb9832', '#50b131', '#36ada4', '#3ba3ec', '#e866f4']
+plt.rcParams.update({
+    'axes.prop_cycle': cycler(color=HUSL_COLORS),
+    'axes.axisbelow': True,
+    'axes.edgecolor': '.8',
+    'axes.facecolor': 'white',
+    'axes.grid': True,
+    'axes.labelcolor': '.15',
+    'font.sans-serif': ['Arial', 'DejaVu Sans', 'Liberation Sans', 'Bitstream Vera Sans', 'sans-serif'],
+    'grid.color': '.8',
+    'lines.solid_capstyle': 'round',
+    'patch.edgecolor': 'w',
+    'patch.force_edgecolor': True,
+    'text.color': '.15',
+    'xtick.bottom': False,
+    'xtick.color': '.15',
+    'ytick.color': '.15',
+    'ytick.left': False,
+})
+plt.ioff()
 
-def plot_throughput(metrics_files: list, output_dir: str):
+
+# Plotted series are stored narrow; matplotlib does not need float64 for display
+PLOT_DTYPES = {
+    'runtime_sec': 'float32',
+    'throughput_eps': 'float32',
+    'ingestion_queue_size': 'float32',
+    'parsed_queue_size': 'float32',
+    'cpu_percent': 'float32',
+    'memory_mb': 'float32',
+    'alerts_count': 'float32',
+}
+
+# Everything the plots and the summary report read; loaded once per file
+METRICS_COLUMNS = [*PLOT_DTYPES, 'events_processed']
+
+EXPERIMENT_NAME_RE = re.compile(r'metrics_w(\d+)_r(\d+)_b(\d+)')
+
+# Above this many samples, throughput traces are rasterized by datashader (if installed)
+DATASHADER_MIN_POINTS = 200_000
+
+# Time series are decimated to about the figure's pixel width; markers only on short runs
+MAX_PLOT_POINTS = 2000
+MARKER_MAX_POINTS = 500
+
+HAS_PARQUET = any(importlib.util.find_spec(m) for m in ('pyarrow', 'fastparquet'))
+CSV_ENGINE = 'pyarrow' if importlib.util.find_spec('pyarrow') else 'c'
+
+
+def load_metrics(metrics_file: str, columns: list = None) -> pd.DataFrame:
+    """
+    Load a metrics CSV through a sibling Parquet cache.
+
+    The first read parses the CSV and writes `<name>.parquet` next to it;
+    later reads load only the requested columns from the cache. The cache
+    is rebuilt when the CSV is newer. Without a Parquet engine
+    (pyarrow/fastparquet) only the requested columns are parsed.
+    
+    Requested columns are returned with the narrow dtypes in PLOT_DTYPES;
+    a full load keeps the CSV's own dtypes.
+    """
+    csv_path = Path(metrics_file)
+    parquet_path = csv_path.with_suffix('.parquet')
+    
+    if parquet_path.exists() and parquet_path.stat().st_mtime >= csv_path.stat().st_mtime:
+        df = pd.read_parquet(parquet_path, columns=columns)
+    elif HAS_PARQUET:
+        df = pd.read_csv(csv_path, engine=CSV_ENGINE)
+        try:
+            df.to_parquet(parquet_path, index=False)
+        except OSError:
+            pass
+        if columns:
+            df = df[columns]
+    else:
+        dtypes = {c: PLOT_DTYPES[c] for c in columns or () if c in PLOT_DTYPES}
+        return pd.read_csv(csv_path, usecols=columns, dtype=dtypes or None)
+    
+    if columns:
+        df = df.astype({c: PLOT_DTYPES[c] for c in columns if c in PLOT_DTYPES})
+    return df
+
+
+def parse_experiment_name(metrics_file: str) -> dict:
+    """Parse `metrics_w{W}_r{R}_b{B}.csv` into its configuration ({} if unstructured)."""
+    match = EXPERIMENT_NAME_RE.match(Path(metrics_file).stem)
+    if not match:
+        return {}
+    workers, rate, batch = map(int, match.groups())
+    return {'workers': workers, 'rate': rate, 'batch': batch}
+
+
+def load_all_metrics(metrics_files: list) -> dict:
+    """
+    Load every metrics file once for all plots.
+
+    Returns a dict of file -> DataFrame holding METRICS_COLUMNS; runs
+    with structured names carry workers/rate/batch in `df.attrs`.
+    """
+    # pandas' C parser and the Parquet reader release the GIL, so files load in parallel
+    with ThreadPoolExecutor() as executor:
+        frames = executor.map(lambda f: load_metrics(f, METRICS_COLUMNS), metrics_files)
+        metrics = dict(zip(metrics_files, frames))
+    
+    for metrics_file, df in metrics.items():
+        df.attrs.update(parse_experiment_name(metrics_file))
+    return metrics
+
+
+def _trace(df: pd.DataFrame, column: str):
+    """
+    Return (x, y, style) for plotting `column` against runtime.
+
+    Series longer than MAX_PLOT_POINTS are strided down to that many samples,
+    and runs longer than MARKER_MAX_POINTS are drawn as thin lines without
+    markers, so Agg never rasterizes more vertices than the canvas can show.
+    """
+    x = df['runtime_sec'].to_numpy()
+    y = df[column].to_numpy()
+    if len(x) > MAX_PLOT_POINTS:
+        idx = np.linspace(0, len(x) - 1, MAX_PLOT_POINTS).astype(np.int64)
+        x, y = x[idx], y[idx]
+    style = {'marker': 'o'} if len(df) <= MARKER_MAX_POINTS else {'linewidth': 1.0}
+    return x, y, style
+
+
+def run_statistics(frames: list) -> pd.DataFrame:
+    """
+    Per-run statistics for a list of metrics frames, one row per frame in order.
+
+    All runs are concatenated into one frame keyed by run, so each
+    statistic is a single groupby pass. Throughput is averaged over the
+    last 50% of each run (after warm-up); totals are the last sample.
+    """
+    big = pd.concat(dict(enumerate(frames)), names=['run', 'row'])
+    runs = big.groupby(level='run')
+    second_half = big['throughput_eps'][runs.cumcount() >= runs['throughput_eps'].transform('size') // 2]
+    
+    stats = runs.agg(
+        max_throughput=('throughput_eps', 'max'),
+        avg_cpu=('cpu_percent', 'mean'),
+        max_memory=('memory_mb', 'max'),
+        total_alerts=('alerts_count', 'last'),
+        total_events=('events_processed', 'last'),
+    )
+    stats['avg_throughput'] = second_half.groupby(level='run').mean()
+    # Runs with no samples drop out of the groupby; give them their row back
+    return stats.reindex(range(len(frames)))
+
+
+def _shade_throughput(ax, metrics: dict):
+    """
+    Rasterize all throughput traces with datashader and show the image on `ax`.
+
+    Cost scales with the canvas size rather than the number of samples.
+    Traces keep the active color cycle and get proxy legend entries.
+    """
+    colors = [to_hex(c) for c in plt.rcParams['axes.prop_cycle'].by_key()['color']]
+    labels = [Path(f).stem.replace('metrics_', '').replace('_', ' ') for f in metrics]
+    color_key = {label: colors[i % len(colors)] for i, label in enumerate(labels)}
+    
+    # A NaN row after each experiment stops datashader joining consecutive traces
+    gap = pd.DataFrame({'runtime_sec': [np.nan], 'throughput_eps': [np.nan]})
+    parts = []
+    for label, df in zip(labels, metrics.values()):
+        parts.append(pd.concat([df[['runtime_sec', 'throughput_eps']], gap]).assign(exp_id=label))
+    long_df = pd.concat(parts, ignore_index=True)
+    long_df['exp_id'] = pd.Categorical(long_df['exp_id'], categories=labels)
+    
+    x_range = (float(long_df['runtime_sec'].min()), float(long_df['runtime_sec'].max()))
+    y_range = (float(long_df['throughput_eps'].min()), float(long_df['throughput_eps'].max()))
+    canvas = ds.Canvas(plot_width=1400, plot_height=600, x_range=x_range, y_range=y_range)
+    agg = canvas.line(long_df, 'runtime_sec', 'throughput_eps', agg=ds.count_cat('exp_id'))
+    img = tf.spread(tf.shade(agg, color_key=color_key, how='eq_hist', min_alpha=200), px=1)
+    
+    ax.imshow(img.to_pil(), extent=(*x_range, *y_range), aspect='auto')
+    handles = [Line2D([], [], color=color_key[label], label=label) for label in labels]
+    ax.legend(handles=handles, bbox_to_anchor=(1.05, 1), loc='upper left')
+
+
+def plot_throughput(metrics: dict, output_dir: str):
     """Plot throughput over time for all experiments."""
     plt.figure(figsize=(14, 6))
     
-    for metrics_file in metrics_files:
-        df = pd.read_csv(metrics_file)
-        label = Path(metrics_file).stem.replace('metrics_', '').replace('_', ' ')
-        plt.plot(df['runtime_sec'], df['throughput_eps'], label=label, marker='o', alpha=0.7)
+    total_points = sum(len(df) for df in metrics.values())
+    if ds is not None and total_points >= DATASHADER_MIN_POINTS:
+        _shade_throughput(plt.gca(), metrics)
+    else:
+        for metrics_file, df in metrics.items():
+            label = Path(metrics_file).stem.replace('metrics_', '').replace('_', ' ')
+            x, y, style = _trace(df, 'throughput_eps')
+            plt.plot(x, y, label=label, alpha=0.7, **style)
+        plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
     
     plt.xlabel('Runtime (seconds)', fontsize=12)
     plt.ylabel('Throughput (events/sec)', fontsize=12)
     plt.title('Throughput Over Time', fontsize=14, fontweight='bold')
-    plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
     plt.grid(True, alpha=0.3)
     plt.tight_layout()
     plt.savefig(f"{output_dir}/throughput.png", dpi=300, bbox_inches='tight')
@@ -31,18 +227,16 @@ def plot_throughput(metrics_files: list, output_dir: str):
     plt.close()
 
 
-def plot_queue_sizes(metrics_files: list, output_dir: str):
+def plot_queue_sizes(metrics: dict, output_dir: str):
     """Plot queue sizes (backpressure indicator)."""
     fig, axes = plt.subplots(1, 2, figsize=(16, 5))
     
-    for metrics_file in metrics_files:
-        df = pd.read_csv(metrics_file)
+    for metrics_file, df in metrics.items():
         label = Path(metrics_file).stem.replace('metrics_', '').replace('_', ' ')
         
-        axes[0].plot(df['runtime_sec'], df['ingestion_queue_size'], 
-                    label=label, marker='o', alpha=0.7)
-        axes[1].plot(df['runtime_sec'], df['parsed_queue_size'], 
-                    label=label, marker='o', alpha=0.7)
+        for ax, column in zip(axes, ('ingestion_queue_size', 'parsed_queue_size')):
+            x, y, style = _trace(df, column)
+            ax.plot(x, y, label=label, alpha=0.7, **style)
     
     axes[0].set_xlabel('Runtime (seconds)', fontsize=11)
     axes[0].set_ylabel('Queue Size', fontsize=11)
@@ -62,18 +256,16 @@ def plot_queue_sizes(metrics_files: list, output_dir: str):
     plt.close()
 
 
-def plot_resource_usage(metrics_files: list, output_dir: str):
+def plot_resource_usage(metrics: dict, output_dir: str):
     """Plot CPU and memory usage."""
     fig, axes = plt.subplots(1, 2, figsize=(16, 5))
     
-    for metrics_file in metrics_files:
-        df = pd.read_csv(metrics_file)
+    for metrics_file, df in metrics.items():
         label = Path(metrics_file).stem.replace('metrics_', '').replace('_', ' ')
         
-        axes[0].plot(df['runtime_sec'], df['cpu_percent'], 
-                    label=label, marker='o', alpha=0.7)
-        axes[1].plot(df['runtime_sec'], df['memory_mb'], 
-                    label=label, marker='o', alpha=0.7)
+        for ax, column in zip(axes, ('cpu_percent', 'memory_mb')):
+            x, y, style = _trace(df, column)
+            ax.plot(x, y, label=label, alpha=0.7, **style)
     
     axes[0].set_xlabel('Runtime (seconds)', fontsize=11)
     axes[0].set_ylabel('CPU %', fontsize=11)
@@ -93,56 +285,38 @@ def plot_resource_usage(metrics_files: list, output_dir: str):
     plt.close()
 
 
-def plot_scalability(metrics_dir: str, output_dir: str):
+def plot_scalability(metrics: dict, output_dir: str):
     """Plot scalability analysis (workers vs throughput)."""
-    # Find all metrics files
-    metrics_files = glob.glob(f"{metrics_dir}/metrics_w*.csv")
+    # Only structured runs carry their configuration
+    structured = {f: df for f, df in metrics.items() if 'workers' in df.attrs}
     
-    if not metrics_files:
+    if not structured:
         print("⚠️  No structured metrics files found for scalability plot")
         print("    Expected format: metrics_w{workers}_r{rate}_b{batch}.csv")
         return
     
-    # Extract final throughput for each configuration
-    data = []
-    for metrics_file in metrics_files:
-        try:
-            df = pd.read_csv(metrics_file)
-            
-            # Parse filename: metrics_w{W}_r{R}_b{B}.csv
-            parts = Path(metrics_file).stem.replace('metrics_', '').split('_')
-            workers = int(parts[0][1:])
-            rate = int(parts[1][1:])
-            batch = int(parts[2][1:])
-            
-            # Get average throughput from last 50% of run
-            mid = len(df) // 2
-            avg_throughput = df['throughput_eps'].iloc[mid:].mean()
-            max_throughput = df['throughput_eps'].max()
-            
-            data.append({
-                'workers': workers,
-                'rate': rate,
-                'batch': batch,
-                'avg_throughput': avg_throughput,
-                'max_throughput': max_throughput
-            })
-        except Exception as e:
-            print(f"⚠️  Error processing {metrics_file}: {e}")
-            continue
-    
-    if not data:
-        print("⚠️  No valid data for scalability plot")
-        return
+    # Configurations as one (n, 3) int32 array: workers, rate, batch
+    frames = list(structured.values())
+    configs = np.array([(f.attrs['workers'], f.attrs['rate'], f.attrs['batch']) for f in frames],
+                       dtype=np.int32)
     
-    df = pd.DataFrame(data)
+    stats = run_statistics(frames)
+    df = pd.DataFrame({
+        'workers': configs[:, 0],
+        'rate': configs[:, 1],
+        'batch': configs[:, 2],
+        'avg_throughput': stats['avg_throughput'].to_numpy(),
+        'max_throughput': stats['max_throughput'].to_numpy(),
+    })
     
     # Create figure with 3 subplots
     fig, axes = plt.subplots(1, 3, figsize=(18, 5))
     
     # Plot 1: Workers vs Throughput (grouped by rate)
-    for rate in sorted(df['rate'].unique()):
-        subset = df[df['rate'] == rate].groupby('workers')['avg_throughput'].mean()
+    # One grouping for every rate: rows are worker counts, columns are rates
+    by_rate = df.groupby(['rate', 'workers'])['avg_throughput'].mean().unstack('rate')
+    for rate in by_rate.columns:
+        subset = by_rate[rate].dropna()
         axes[0].plot(subset.index, subset.values, marker='o', linewidth=2, 
                     markersize=8, label=f'Rate: {rate}')
     
@@ -176,15 +350,15 @@ def plot_scalability(metrics_dir: str, output_dir: str):
     plt.close()
 
 
-def plot_alerts_over_time(metrics_files: list, output_dir: str):
+def plot_alerts_over_time(metrics: dict, output_dir: str):
     """Plot alert generation over time."""
     plt.figure(figsize=(14, 6))
     
-    for metrics_file in metrics_files:
-        df = pd.read_csv(metrics_file)
+    for metrics_file, df in metrics.items():
         label = Path(metrics_file).stem.replace('metrics_', '').replace('_', ' ')
-        plt.plot(df['runtime_sec'], df['alerts_count'], label=label, 
-                marker='o', linewidth=2, alpha=0.7)
+        x, y, style = _trace(df, 'alerts_count')
+        style.setdefault('linewidth', 2)
+        plt.plot(x, y, label=label, alpha=0.7, **style)
     
     plt.xlabel('Runtime (seconds)', fontsize=12)
     plt.ylabel('Cumulative Alerts', fontsize=12)
@@ -197,29 +371,63 @@ def plot_alerts_over_time(metrics_files: list, output_dir: str):
     plt.close()
 
 
-def generate_summary_report(metrics_files: list, output_dir: str):
-    """Generate a summary report comparing all experiments."""
-    summary_data = []
+DASHBOARD_PANELS = [
+    # (column, y label, title)
+    ('throughput_eps', 'Throughput (events/sec)', 'Throughput Over Time'),
+    ('ingestion_queue_size', 'Queue Size', 'Ingestion Queue Size'),
+    ('parsed_queue_size', 'Queue Size', 'Parsed Queue Size'),
+    ('cpu_percent', 'CPU %', 'CPU Utilization'),
+    ('memory_mb', 'Memory (MB)', 'Memory Usage'),
+    ('alerts_count', 'Cumulative Alerts', 'Alert Generation Over Time'),
+]
+
+
+def plot_dashboard(metrics: dict, output_dir: str):
+    """Plot all time series as one 2x3 dashboard, rasterized by a single savefig."""
+    fig, axes = plt.subplots(2, 3, figsize=(18, 10))
     
-    for metrics_file in metrics_files:
-        df = pd.read_csv(metrics_file)
-        filename = Path(metrics_file).stem
-        
-        # Calculate statistics
-        mid = len(df) // 2
-        summary = {
-            'Experiment': filename.replace('metrics_', '').replace('_', ' '),
-            'Avg Throughput': f"{df['throughput_eps'].iloc[mid:].mean():.1f}",
-            'Max Throughput': f"{df['throughput_eps'].max():.1f}",
-            'Avg CPU %': f"{df['cpu_percent'].mean():.1f}",
-            'Max Memory (MB)': f"{df['memory_mb'].max():.1f}",
-            'Total Alerts': df['alerts_count'].iloc[-1] if len(df) > 0 else 0,
-            'Total Events': df['events_processed'].iloc[-1] if len(df) > 0 else 0
-        }
-        summary_data.append(summary)
+    for metrics_file, df in metrics.items():
+        label = Path(metrics_file).stem.replace('metrics_', '').replace('_', ' ')
+        for ax, (column, _, _) in zip(axes.flat, DASHBOARD_PANELS):
+            x, y, style = _trace(df, column)
+            ax.plot(x, y, label=label, alpha=0.7, **style)
+    
+    for ax, (_, ylabel, title) in zip(axes.flat, DASHBOARD_PANELS):
+        ax.set_xlabel('Runtime (seconds)', fontsize=11)
+        ax.set_ylabel(ylabel, fontsize=11)
+        ax.set_title(title, fontsize=12, fontweight='bold')
+        ax.grid(True, alpha=0.3)
+    
+    # Every panel shares the same experiments, so one legend covers the figure
+    handles, labels = axes[0, 0].get_legend_handles_labels()
+    fig.legend(handles, labels, loc='center left', bbox_to_anchor=(1.0, 0.5))
+    
+    plt.tight_layout()
+    plt.savefig(f"{output_dir}/dashboard.png", dpi=200, bbox_inches='tight')
+    print(f"✅ Saved: {output_dir}/dashboard.png")
+    plt.close()
+
+
+def _run_plot(plot, metrics: dict, output_dir: str):
+    """Pool entry point: render one plot function in a worker process."""
+    plot(metrics, output_dir)
+
+
+def generate_summary_report(metrics: dict, output_dir: str):
+    """Generate a summary report comparing all experiments."""
+    stats = run_statistics(list(metrics.values()))
+    one_decimal = '{:.1f}'.format
     
     # Create summary DataFrame and save
-    summary_df = pd.DataFrame(summary_data)
+    summary_df = pd.DataFrame({
+        'Experiment': [Path(f).stem.replace('metrics_', '').replace('_', ' ') for f in metrics],
+        'Avg Throughput': stats['avg_throughput'].map(one_decimal),
+        'Max Throughput': stats['max_throughput'].map(one_decimal),
+        'Avg CPU %': stats['avg_cpu'].map(one_decimal),
+        'Max Memory (MB)': stats['max_memory'].map(one_decimal),
+        'Total Alerts': stats['total_alerts'].fillna(0).astype(int),
+        'Total Events': stats['total_events'].fillna(0).astype(int),
+    })
     summary_df.to_csv(f"{output_dir}/summary_report.csv", index=False)
     
     # Also save as formatted text
@@ -247,6 +455,8 @@ def main():
                        help='Directory with metrics CSV files')
     parser.add_argument('--output-dir', default='results/plots',
                        help='Output directory for plots')
+    parser.add_argument('--dashboard', action='store_true',
+                       help='Render the time-series plots as a single dashboard.png')
     
     args = parser.parse_args()
     
@@ -270,15 +480,20 @@ def main():
     
     # Generate plots
     print("Generating plots...")
-    plot_throughput(metrics_files, args.output_dir)
-    plot_queue_sizes(metrics_files, args.output_dir)
-    plot_resource_usage(metrics_files, args.output_dir)
-    plot_alerts_over_time(metrics_files, args.output_dir)
-    plot_scalability(args.metrics_dir, args.output_dir)
+    metrics = load_all_metrics(metrics_files)
+    if args.dashboard:
+        plots = [plot_dashboard, plot_scalability]
+    else:
+        plots = [plot_throughput, plot_queue_sizes, plot_resource_usage,
+                 plot_alerts_over_time, plot_scalability]
+    
+    # Agg rasterization holds the GIL, so each figure renders in its own process
+    with multiprocessing.Pool(min(len(plots), os.cpu_count() or 1)) as pool:
+        pool.starmap(_run_plot, [(plot, metrics, args.output_dir) for plot in plots])
     
     # Generate summary report
     print("\nGenerating summary report...")
-    generate_summary_report(metrics_files, args.output_dir)
+    generate_summary_report(metrics, args.output_dir)
     
     print(f"\n{'='*80}")
     print(f"✅ All visualizations saved to: {args.output_dir}")
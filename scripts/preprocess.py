@@ -1,24 +1,203 @@
 import argparse
-import random
+import mmap
 from pathlib import Path
 import re
 
+import numpy as np
 
-def is_suspicious_line(line: str) -> bool:
-    """Check if a log line contains suspicious patterns."""
-    # Check for error status codes (400-599)
-    if re.search(r'" [4-5]\d{2} ', line):
+try:
+    import ahocorasick
+except ImportError:  # optional: single-pass multi-pattern matching
+    ahocorasick = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # optional: classify a whole chunk in Arrow compute
+    pa = None
+
+try:
+    from numba import njit, prange
+except ImportError:  # optional: compiled byte-level scan over the mmapped file
+    njit = None
+
+
+# Error status codes (400-599)
+STATUS_RE = re.compile(rb'" [4-5]\d{2} ')
+
+ATTACK_PATTERNS = (
+    b'../', b'union select', b'/etc/passwd', b'cmd=', 
+    b'<script', b'exec(', b'eval(', b'phpinfo', b'shell',
+    b'wget', b'curl', b'../../', b'base64'
+)
+ATTACK_RE = re.compile(b'|'.join(re.escape(pattern) for pattern in ATTACK_PATTERNS))
+
+if ahocorasick is not None:
+    # The automaton is str-keyed; latin-1 maps each byte to one code point
+    ATTACK_AUTOMATON = ahocorasick.Automaton()
+    for _pattern in ATTACK_PATTERNS:
+        ATTACK_AUTOMATON.add_word(_pattern.decode('latin-1'), _pattern)
+    ATTACK_AUTOMATON.make_automaton()
+else:
+    ATTACK_AUTOMATON = None
+
+CHUNK_LINES = 100000
+PROGRESS_LINES = 100000
+WINDOW_BYTES = 16 << 20  # about 100k Apache lines
+
+
+def is_suspicious_line(line: bytes) -> bool:
+    """Check if a raw log line contains suspicious patterns."""
+    if STATUS_RE.search(line):
         return True
     
-    # Check for attack patterns
+    # Check for attack patterns in one pass (bytes.lower only maps ASCII A-Z)
     line_lower = line.lower()
-    attack_patterns = [
-        '../', 'union select', '/etc/passwd', 'cmd=', 
-        '<script', 'exec(', 'eval(', 'phpinfo', 'shell',
-        'wget', 'curl', '../../', 'base64'
-    ]
+    if ATTACK_AUTOMATON is not None:
+        return next(ATTACK_AUTOMATON.iter(line_lower.decode('latin-1')), None) is not None
+    return ATTACK_RE.search(line_lower) is not None
+
+
+def suspicious_mask(lines: list) -> np.ndarray:
+    """Vectorized is_suspicious_line over a list of stripped raw lines."""
+    if pa is not None:
+        arr = pa.array(lines, type=pa.binary())
+        # ascii_lower needs a string type; the view reinterprets bytes without validating UTF-8
+        lowered = pc.ascii_lower(arr.view(pa.string()))
+        mask = pc.or_(pc.match_substring_regex(arr, STATUS_RE.pattern.decode()),
+                      pc.match_substring_regex(lowered, ATTACK_RE.pattern.decode()))
+        return mask.to_numpy(zero_copy_only=False)
+    return np.fromiter(map(is_suspicious_line, lines), dtype=bool, count=len(lines))
+
+
+def _build_scan_dfa(patterns) -> tuple:
+    """
+    Compile byte patterns into an Aho-Corasick DFA for _scan_lines.
+
+    Returns a flat int32 table where table[state * 256 + byte] is the next
+    state, with ASCII case folded in; -1 means a pattern just matched.
+    """
+    goto = [{}]
+    accept = [False]
+    for pattern in patterns:
+        state = 0
+        for byte in pattern:
+            if byte not in goto[state]:
+                goto.append({})
+                accept.append(False)
+                goto[state][byte] = len(goto) - 1
+            state = goto[state][byte]
+        accept[state] = True
+    
+    table = np.zeros((len(goto), 256), dtype=np.int32)
+    fail = [0] * len(goto)
+    queue = []
+    for byte, child in goto[0].items():
+        table[0, byte] = child
+        queue.append(child)
+    for state in queue:  # breadth-first, so fail states are complete before use
+        accept[state] = accept[state] or accept[fail[state]]
+        table[state] = table[fail[state]]
+        for byte, child in goto[state].items():
+            fail[child] = table[fail[state], byte]
+            table[state, byte] = child
+            queue.append(child)
     
-    return any(pattern in line_lower for pattern in attack_patterns)
+    upper = np.arange(ord('A'), ord('Z') + 1)
+    table[:, upper] = table[:, upper + 32]
+    table[np.array(accept)[table]] = -1
+    return table.ravel()
+
+
+if njit is not None:
+    # Error statuses spelled out as literals so one DFA covers both checks
+    SCAN_TABLE = _build_scan_dfa(
+        ATTACK_PATTERNS + tuple(b'" %d ' % status for status in range(400, 600)))
+
+    # cache=True: reuse the compiled kernel from __pycache__ on later runs
+    @njit(parallel=True, cache=True)
+    def _scan_lines(data, starts, ends, table):
+        """
+        Strip each [start, end) line in place and flag suspicious ones.
+
+        One DFA step per byte; same rules as is_suspicious_line.
+        """
+        n = len(starts)
+        mask = np.zeros(n, dtype=np.bool_)
+        for i in prange(n):
+            s = starts[i]
+            e = ends[i]
+            # ASCII whitespace, as bytes.strip(): space and \t \n \v \f \r
+            while s < e and (data[s] == 32 or 9 <= data[s] <= 13):
+                s += 1
+            while e > s and (data[e - 1] == 32 or 9 <= data[e - 1] <= 13):
+                e -= 1
+            starts[i] = s
+            ends[i] = e
+            
+            state = 0
+            for j in range(s, e):
+                state = table[state * 256 + data[j]]
+                if state < 0:
+                    mask[i] = True
+                    break
+        return mask
+
+
+def _line_bounds(data: np.ndarray) -> tuple:
+    """Return int64 (starts, ends) of every line in a uint8 buffer, newlines excluded."""
+    newlines = np.flatnonzero(data == 10)
+    starts = np.concatenate(([0], newlines + 1))
+    ends = np.append(newlines, len(data))
+    if starts[-1] == len(data):  # file ends with a newline
+        starts, ends = starts[:-1], ends[:-1]
+    return starts, ends
+
+
+def _line_windows(mm, data: np.ndarray):
+    """Yield absolute (starts, ends) for the whole lines in each ~WINDOW_BYTES window."""
+    pos = 0
+    while pos < len(data):
+        end = mm.find(b'\n', min(pos + WINDOW_BYTES, len(data)) - 1)
+        end = len(data) if end < 0 else end + 1
+        starts, ends = _line_bounds(data[pos:end])
+        yield starts + pos, ends + pos
+        pos = end
+
+
+def _classify_lines(mm, data: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> tuple:
+    """
+    Classify one window of lines of the mapped file.
+
+    Returns (suspicious, nonempty) boolean arrays indexed like starts/ends.
+    With numba, _scan_lines also strips starts/ends in place; otherwise
+    the lines are sliced out of the map only long enough to be classified.
+    """
+    if njit is not None:
+        suspicious = _scan_lines(data, starts, ends, SCAN_TABLE)
+        return suspicious, ends > starts
+    lines = [mm[s:e].strip() for s, e in zip(starts.tolist(), ends.tolist())]
+    nonempty = np.fromiter(map(len, lines), dtype=np.int64, count=len(lines)) > 0
+    return suspicious_mask(lines), nonempty  # empty lines never match
+
+
+def _reservoir_sample(reservoir: np.ndarray, seen: int, rows: np.ndarray, rng) -> int:
+    """
+    Offer a batch of rows to a fixed-size reservoir (Algorithm R, vectorized).
+
+    `seen` is how many rows were offered before this batch; returns the new total.
+    """
+    size = len(reservoir)
+    fill = max(0, min(len(rows), size - seen))
+    reservoir[seen:seen + fill] = rows[:fill]
+    rest = rows[fill:]
+    if len(rest):
+        # The n-th row (0-based) replaces slot j ~ U[0, n] if j < size; a later row wins a shared slot
+        slots = rng.integers(0, seen + fill + np.arange(1, len(rest) + 1))
+        hit = np.flatnonzero(slots < size)[::-1]
+        taken, last = np.unique(slots[hit], return_index=True)
+        reservoir[taken] = rest[hit[last]]
+    return seen + len(rows)
 
 
 def preprocess_log(input_file: str, output_file: str, sample: int = 0):
@@ -33,52 +212,77 @@ def preprocess_log(input_file: str, output_file: str, sample: int = 0):
     """
     print(f"📄 Preprocessing: {input_file}")
     
-    normal_lines = []
-    suspicious_lines = []
+    rng = np.random.default_rng()
+    empty_rows = np.empty((0, 2), dtype=np.int64)
+    suspicious_rows = [empty_rows]  # (start, end) offsets per window
+    normal_rows = [empty_rows]      # only used when keeping every normal line
+    reservoir = np.empty((max(sample, 0), 2), dtype=np.int64)
+    normal_count = 0
+    lines_read = 0
+    next_report = PROGRESS_LINES
+    
+    output_path = Path(output_file)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(input_file, 'r', encoding='utf-8', errors='ignore') as f:
-        for i, line in enumerate(f):
-            line = line.strip()
-            if line:  # Skip empty lines
-                if is_suspicious_line(line):
-                    suspicious_lines.append(line)
-                else:
-                    normal_lines.append(line)
+    # One pass over the mapped file classifies each window and feeds its normal
+    # lines to the reservoir; only (start, end) offsets are kept. Lines stay raw
+    # bytes and are copied out of the map only when written.
+    with open(input_file, 'rb') as f:
+        # mmap rejects empty files; empty bytes slices the same way. The map is not
+        # closed explicitly: numpy views of it (including ones numba keeps while
+        # compiling) hold its buffer exported, so it is unmapped once collected
+        mm = b'' if Path(input_file).stat().st_size == 0 else mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        data = np.frombuffer(mm, dtype=np.uint8)
+        for starts, ends in _line_windows(mm, data):
+            suspicious, nonempty = _classify_lines(mm, data, starts, ends)
+            rows = np.column_stack((starts, ends))
+            suspicious_rows.append(rows[suspicious])
+            
+            # Sample ONLY normal lines, keep ALL suspicious ones
+            normals = rows[nonempty & ~suspicious]
+            if sample > 0:
+                normal_count = _reservoir_sample(reservoir, normal_count, normals, rng)
+            else:
+                normal_rows.append(normals)
+                normal_count += len(normals)
             
-            if i % 100000 == 0 and i > 0:
-                print(f"  Read {i:,} lines...")
+            lines_read += len(starts)
+            if lines_read >= next_report:
+                print(f"  Read {lines_read:,} lines...")
+                next_report = (lines_read // PROGRESS_LINES + 1) * PROGRESS_LINES
+        
+        if sample > 0:
+            normal_rows = [reservoir[:min(sample, normal_count)]]
+        
+        # Combine: ALL suspicious + sampled normal
+        suspicious_count = sum(map(len, suspicious_rows))
+        picked = np.concatenate(suspicious_rows + normal_rows)
+        
+        # Shuffle to mix suspicious events throughout (permutes offset pairs, not line objects)
+        rng.shuffle(picked)
+        
+        # Write output: one join + write per CHUNK_LINES lines, straight from the map
+        with open(output_file, 'wb') as out:
+            for lo in range(0, len(picked), CHUNK_LINES):
+                out.write(b'\n'.join([mm[s:e].strip() for s, e in picked[lo:lo + CHUNK_LINES].tolist()]))
+                out.write(b'\n')
     
+    total_count = normal_count + suspicious_count
     print(f"\n  📊 Statistics:")
-    print(f"     Total lines: {len(normal_lines) + len(suspicious_lines):,}")
-    print(f"     Normal lines: {len(normal_lines):,}")
-    print(f"     Suspicious lines: {len(suspicious_lines):,}")
-    print(f"     Suspicious %: {len(suspicious_lines)/(len(normal_lines)+len(suspicious_lines))*100:.2f}%")
-    
-    # Sample ONLY normal lines, keep ALL suspicious ones
-    if sample > 0 and sample < len(normal_lines):
-        normal_lines = random.sample(normal_lines, sample)
-        print(f"\n  ✂️  Sampled {len(normal_lines):,} normal lines")
-    
-    # Combine: ALL suspicious + sampled normal
-    all_lines = suspicious_lines + normal_lines
-    
-    # Shuffle to mix suspicious events throughout
-    random.shuffle(all_lines)
-    
-    # Write output
-    output_path = Path(output_file)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    print(f"     Total lines: {total_count:,}")
+    print(f"     Normal lines: {normal_count:,}")
+    print(f"     Suspicious lines: {suspicious_count:,}")
+    print(f"     Suspicious %: {suspicious_count/total_count*100:.2f}%")
     
-    with open(output_file, 'w') as f:
-        for line in all_lines:
-            f.write(line + '\n')
+    if sample > 0 and sample < normal_count:
+        print(f"\n  ✂️  Sampled {sample:,} normal lines")
     
     print(f"\n  ✅ Saved to: {output_file}")
-    print(f"  ✅ Total output lines: {len(all_lines):,}")
-    print(f"  ✅ Kept ALL {len(suspicious_lines):,} suspicious events!")
+    print(f"  ✅ Total output lines: {len(picked):,}")
+    print(f"  ✅ Kept ALL {suspicious_count:,} suspicious events!")
     
-    if len(suspicious_lines) > 0:
-        print(f"\n  🎯 Alert potential: {len(suspicious_lines):,} suspicious events preserved")
+    if suspicious_count > 0:
+        print(f"\n  🎯 Alert potential: {suspicious_count:,} suspicious events preserved")
         print(f"     (Need 5+ from same IP within 60s to trigger alert)")
 
 
@@ -1,11 +1,32 @@
 import argparse
+import itertools
+import os
 import time
-from datetime import datetime
+
+
+BURST_SIZE = 256      # max events emitted between pacing checks
+MIN_SLEEP = 0.001     # below ~1ms, sleeping costs more than it paces
+WRITE_BUFFER = 65536  # bytes accumulated before a write to stdout
+
+
+def _write_stdout(buf: bytearray):
+    """Write the whole buffer to fd 1, bypassing sys.stdout's encoder and lock."""
+    with memoryview(buf) as view:
+        written = 0
+        while written < len(view):
+            written += os.write(1, view[written:])
+    buf.clear()
 
 
 def replay_log(input_file: str, rate: int, duration: int = 0):
     """
     Replay log file to stdout at specified rate.
+
+    Pacing is a token bucket: events go out in bursts and the replayer
+    only sleeps when it is ahead of `start + events_sent / rate`, so
+    per-event sleep/syscall overhead does not cap the achievable rate.
+    Lines are copied as raw bytes into a buffer that is written to stdout
+    when it fills up or before the replayer sleeps.
     
     Args:
         input_file: Path to log file
@@ -14,30 +35,46 @@ def replay_log(input_file: str, rate: int, duration: int = 0):
     """
     print(f"▶️  Replaying: {input_file} at {rate} events/sec", flush=True)
     
-    start_time = time.time()
+    # Keep bursts to ~10ms worth of events so low rates stay smooth
+    burst = min(BURST_SIZE, max(1, rate // 100)) if rate > 0 else BURST_SIZE
+    buf = bytearray()
+    
+    start_time = time.perf_counter()
     events_sent = 0
     
-    with open(input_file, 'r') as f:
+    with open(input_file, 'rb') as f:
         while True:
-            line = f.readline()
+            lines = list(itertools.islice(f, burst))
             
             # Loop back if EOF
-            if not line:
+            if not lines:
+                f.seek(0)
+                if not f.readline():
+                    break  # empty file
                 f.seek(0)
                 continue
             
-            # Output event
-            print(line.strip())
-            events_sent += 1
+            # Output events (lines keep their own newlines)
+            buf += b''.join(lines)
+            if not lines[-1].endswith(b'\n'):
+                buf += b'\n'
+            events_sent += len(lines)
+            if len(buf) >= WRITE_BUFFER:
+                _write_stdout(buf)
             
-            # Rate limiting
+            # Rate limiting: sleep only when ahead of schedule
+            elapsed = time.perf_counter() - start_time
             if rate > 0:
-                time.sleep(1.0 / rate)
+                ahead = events_sent / rate - elapsed
+                if ahead > MIN_SLEEP:
+                    _write_stdout(buf)
+                    time.sleep(ahead)
             
             # Check duration
-            if duration > 0 and (time.time() - start_time) >= duration:
+            if duration > 0 and elapsed >= duration:
                 break
     
+    _write_stdout(buf)
     print(f"[OK] Replayed {events_sent:,} events", flush=True)
 
 
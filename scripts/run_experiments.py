@@ -1,5 +1,9 @@
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 import itertools
+import os
+import queue
+import shutil
 import subprocess
 import json
 from pathlib import Path
@@ -7,10 +11,13 @@ from datetime import datetime
 
 
 def run_experiment(input_file: str, workers: int, rate: int, batch: int, 
-                   duration: int, output_dir: str) -> dict:
+                   duration: int, output_dir: str, cpus: list = None) -> dict:
     """
     Run single experiment with given parameters.
     
+    Args:
+        cpus: Optional CPU ids to pin the pipeline to (via taskset)
+    
     Returns:
         Dictionary with experiment results
     """
@@ -34,17 +41,28 @@ def run_experiment(input_file: str, workers: int, rate: int, batch: int,
         '--db', db_file,
         '--metrics', metrics_file
     ]
+    if cpus:
+        cmd = ['taskset', '-c', ','.join(map(str, cpus))] + cmd
     
     start = datetime.now()
+    # Only the exit status matters; stdout goes straight to /dev/null so a
+    # chatty pipeline never blocks on (or buffers into) a full pipe
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=duration+30)
-        success = result.returncode == 0
+        _, stderr = proc.communicate(timeout=duration+30)
+        success = proc.returncode == 0
     except subprocess.TimeoutExpired:
+        proc.kill()
+        _, stderr = proc.communicate()
         success = False
-        result = None
     
     end = datetime.now()
     
+    if not success:
+        print(f"[FAIL] {exp_id} (exit code {proc.returncode})")
+        if stderr:
+            print('\n'.join(stderr.strip().splitlines()[-10:]))
+    
     return {
         'exp_id': exp_id,
         'workers': workers,
@@ -72,6 +90,9 @@ def main():
                        help='Duration per experiment')
     parser.add_argument('--output-dir', default='results',
                        help='Output directory')
+    parser.add_argument('--parallel', type=int, default=1,
+                       help='Experiments to run concurrently (0=auto: CPUs // max workers). '
+                            'Concurrent runs share the machine, so keep 1 for final numbers')
     
     args = parser.parse_args()
     
@@ -87,17 +108,42 @@ def main():
     print(f"   Batches: {args.batches}")
     print(f"   Duration: {args.duration}s per experiment")
     
-    results = []
-    
-    for i, (workers, rate, batch) in enumerate(combinations, 1):
-        print(f"\\n[{i}/{len(combinations)}] ", end='')
-        
-        result = run_experiment(
-            args.input, workers, rate, batch, 
-            args.duration, args.output_dir
-        )
-        
-        results.append(result)
+    parallel = args.parallel
+    if parallel <= 0:
+        parallel = max(1, (os.cpu_count() or 1) // max(args.workers))
+    parallel = min(parallel, len(combinations))
+    
+    # Give each concurrent slot its own disjoint set of CPUs so pipelines
+    # don't migrate across each other's cores
+    cpu_groups = queue.Queue()
+    cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else []
+    group_size = len(cpus) // parallel
+    if parallel > 1 and group_size > 0 and shutil.which('taskset'):
+        print(f"   Parallel: {parallel} experiments, {group_size} CPUs each")
+        for slot in range(parallel):
+            cpu_groups.put(cpus[slot * group_size:(slot + 1) * group_size])
+    else:
+        if parallel > 1:
+            print(f"   Parallel: {parallel} experiments (unpinned)")
+        for _ in range(parallel):
+            cpu_groups.put(None)
+    
+    def run_slot(i, workers, rate, batch):
+        group = cpu_groups.get()
+        try:
+            print(f"\\n[{i}/{len(combinations)}] ", end='')
+            return run_experiment(
+                args.input, workers, rate, batch, 
+                args.duration, args.output_dir, group
+            )
+        finally:
+            cpu_groups.put(group)
+    
+    # Popen.communicate() blocks outside the GIL, so threads are enough here
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        futures = [executor.submit(run_slot, i, workers, rate, batch)
+                   for i, (workers, rate, batch) in enumerate(combinations, 1)]
+        results = [future.result() for future in futures]
     
     # Save summary
     summary_file = f"{args.output_dir}/experiments_summary.json"
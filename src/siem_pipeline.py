@@ -4,15 +4,136 @@ import sys
 import time
 import sqlite3
 import csv
+import mmap
+import os
+import queue
+import threading
 from datetime import datetime, timedelta
-from multiprocessing import Process, Queue, Event, Manager
+from multiprocessing import Process, Queue, Event, Value
 from pathlib import Path
 from typing import Dict, List, Optional
-from collections import defaultdict, deque
+from dataclasses import dataclass, field, fields
 
 import psutil
 
-from utils import parse_apache_log, enrich_ip, enrich_user_agent, is_suspicious
+from utils import parse_apache_log, enrich_ip, enrich_user_agent, is_suspicious, AlertTracker
+
+# Seconds the indexer waits for its writer thread to drain on shutdown
+WRITER_JOIN_TIMEOUT = 10
+
+# Bytes of the input file decoded per ingestor refill
+INGEST_WINDOW = 1 << 20
+
+# Parsed events per parsed_queue message (amortizes pickling and pipe writes)
+PARSED_BATCH = 64
+
+# Alert when an IP has ALERT_THRESHOLD suspicious events within ALERT_WINDOW_NS;
+# don't re-alert the same IP within ALERT_COOLDOWN_NS (5 minutes)
+ALERT_THRESHOLD = 5
+ALERT_WINDOW_NS = 60_000_000_000
+ALERT_COOLDOWN_NS = 300_000_000_000
+
+# Codes stored in the INTEGER enum columns of events; 0 means anything else
+METHOD_IDS = {
+    'GET': 1, 'POST': 2, 'HEAD': 3, 'PUT': 4, 'DELETE': 5,
+    'OPTIONS': 6, 'PATCH': 7, 'CONNECT': 8, 'TRACE': 9, 'LOG': 10,
+}
+BROWSER_IDS = {'Firefox': 1, 'Chrome': 2, 'Safari': 3, 'Internet Explorer': 4}
+OS_IDS = {'Windows': 1, 'macOS': 2, 'Linux': 3, 'Android': 4, 'iOS': 5}
+IP_CLASS_IDS = {'private': 1, 'localhost': 2, 'public': 3}
+
+# Lookup tables setup_database writes so the codes can be decoded in SQL:
+# (table, events column, codes, name for code 0)
+CODE_TABLES = (
+    ('method_codes', 'method', METHOD_IDS, 'OTHER'),
+    ('browser_codes', 'browser', BROWSER_IDS, 'Other'),
+    ('os_codes', 'os', OS_IDS, 'Other'),
+    ('ip_class_codes', 'ip_class', IP_CLASS_IDS, 'unknown'),
+)
+
+# events table columns written by _flush_batch, in Batch row order.
+# The INSERT text is built once so sqlite3's statement cache always hits
+_EVENT_COLUMNS = (
+    'ip', 'timestamp', 'method', 'url', 'status', 'bytes', 'referer', 'user_agent',
+    'browser', 'os', 'ip_class', 'suspicious', 'ingested_at',
+    'ingested_at_ms',
+)
+_INSERT_SQL = (
+    f"INSERT INTO events ({', '.join(_EVENT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(_EVENT_COLUMNS))})"
+)
+
+# events table schema; {table} lets _rebuild_events_table create a copy
+_EVENTS_TABLE_SQL = """
+        CREATE TABLE IF NOT EXISTS {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ip TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            method INTEGER,
+            url TEXT,
+            status INTEGER,
+            bytes INTEGER,
+            referer TEXT,
+            user_agent TEXT,
+            browser INTEGER,
+            os INTEGER,
+            ip_class INTEGER,
+            suspicious INTEGER,
+            ingested_at TEXT NOT NULL,
+            indexed_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')),
+            ingested_at_ms INTEGER,
+            indexed_at_ms INTEGER DEFAULT (CAST(ROUND((julianday('now') - 2440587.5) * 86400000) AS INTEGER))
+        )
+    """
+
+
+@dataclass
+class Batch:
+    """
+    Parsed events in column-per-list form.
+
+    Parser workers ship one Batch per queue message instead of a list of
+    dicts: a handful of lists pickle far smaller than per-event dicts that
+    repeat every key. Enum columns hold the *_IDS codes.
+    """
+    ips: List[str] = field(default_factory=list)
+    timestamps: List[str] = field(default_factory=list)
+    methods: List[int] = field(default_factory=list)
+    urls: List[str] = field(default_factory=list)
+    statuses: List[int] = field(default_factory=list)
+    bytes_sent: List[int] = field(default_factory=list)
+    referers: List[str] = field(default_factory=list)
+    user_agents: List[str] = field(default_factory=list)
+    browsers: List[int] = field(default_factory=list)
+    oses: List[int] = field(default_factory=list)
+    ip_classes: List[int] = field(default_factory=list)
+    suspicious: List[bool] = field(default_factory=list)
+    ingested_ns: List[int] = field(default_factory=list)
+    
+    def __len__(self) -> int:
+        return len(self.ips)
+    
+    def append(self, event: Dict, ip_data: Dict, ua_data: Dict, suspicious: bool,
+               ingested_ns: int):
+        """Append one parsed event together with its enrichment results."""
+        self.ips.append(event['ip'])
+        self.timestamps.append(event['timestamp'].isoformat())
+        self.methods.append(METHOD_IDS.get(event['method'], 0))
+        self.urls.append(event['url'])
+        self.statuses.append(event['status'])
+        self.bytes_sent.append(event['bytes'])
+        self.referers.append(event['referer'])
+        self.user_agents.append(event['user_agent'])
+        self.browsers.append(BROWSER_IDS.get(ua_data['browser'], 0))
+        self.oses.append(OS_IDS.get(ua_data['os'], 0))
+        self.ip_classes.append(IP_CLASS_IDS.get(ip_data['ip_class'], 0))
+        self.suspicious.append(suspicious)
+        self.ingested_ns.append(ingested_ns)
+    
+    def extend(self, other: 'Batch'):
+        """Append every row of another batch."""
+        for f in fields(self):
+            getattr(self, f.name).extend(getattr(other, f.name))
 
 
 # Global shutdown event
@@ -35,32 +156,39 @@ def setup_database(db_path: str) -> sqlite3.Connection:
     Returns:
         Database connection
     """
-    conn = sqlite3.connect(db_path, check_same_thread=False)
+    # Autocommit mode: _flush_batch opens one explicit transaction per batch
+    conn = sqlite3.connect(db_path, isolation_level=None)
     
     # Enable WAL mode for better concurrency
     conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("PRAGMA synchronous=NORMAL")
     
-    # Create events table
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS events (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            ip TEXT NOT NULL,
-            timestamp TEXT NOT NULL,
-            method TEXT,
-            url TEXT,
-            status INTEGER,
-            bytes INTEGER,
-            referer TEXT,
-            user_agent TEXT,
-            browser TEXT,
-            os TEXT,
-            ip_class TEXT,
-            suspicious BOOLEAN,
-            ingested_at TEXT NOT NULL,
-            indexed_at TEXT
-        )
-    """)
+    # Keep temp tables, page cache (64 MiB) and reads in memory; checkpoint less often
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536")
+    conn.execute("PRAGMA mmap_size=1073741824")
+    conn.execute("PRAGMA wal_autocheckpoint=10000")
+    
+    # Create events table (method/browser/os/ip_class hold the *_IDS codes)
+    # indexed_at/indexed_at_ms default to the same SQLite 'now' at insert
+    conn.execute(_EVENTS_TABLE_SQL.format(table='events'))
+    
+    # Databases created before the epoch-ms columns existed: add and backfill them
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(events)")}
+    for column in ('ingested_at', 'indexed_at'):
+        if f"{column}_ms" not in columns:
+            conn.execute(f"ALTER TABLE events ADD COLUMN {column}_ms INTEGER")
+            conn.execute(f"""
+                UPDATE events
+                SET {column}_ms = CAST(ROUND((julianday({column}, 'utc') - 2440587.5) * 86400000) AS INTEGER)
+                WHERE {column} IS NOT NULL
+            """)
+    
+    # _flush_batch does not bind indexed_at/indexed_at_ms, so older tables
+    # without their DEFAULTs (ALTER TABLE cannot add one) are rebuilt
+    defaults = {row[1]: row[4] for row in conn.execute("PRAGMA table_info(events)")}
+    if defaults['indexed_at'] is None or defaults['indexed_at_ms'] is None:
+        _rebuild_events_table(conn)
     
     # Create alerts table
     conn.execute("""
@@ -81,13 +209,49 @@ def setup_database(db_path: str) -> sqlite3.Connection:
     conn.execute("CREATE INDEX IF NOT EXISTS idx_status ON events(status)")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_suspicious ON events(suspicious)")
     
+    # Code -> name tables for the INTEGER enum columns, and events_view which
+    # shows events with names instead of codes. COALESCE passes through text
+    # values stored by databases created before the columns were encoded
+    for table, _, codes, other in CODE_TABLES:
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY, name TEXT NOT NULL)")
+        conn.executemany(
+            f"INSERT OR IGNORE INTO {table} (id, name) VALUES (?, ?)",
+            [(0, other), *((code, name) for name, code in codes.items())]
+        )
+    decoded = {column: f"COALESCE({table}.name, e.{column}) AS {column}"
+               for table, column, _, _ in CODE_TABLES}
+    joins = ' '.join(f"LEFT JOIN {table} ON {table}.id = e.{column}"
+                     for table, column, _, _ in CODE_TABLES)
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(events)")]
+    view_columns = ', '.join(decoded.get(c, f"e.{c}") for c in columns)
+    conn.execute(f"CREATE VIEW IF NOT EXISTS events_view AS SELECT {view_columns} FROM events e {joins}")
+    
     conn.commit()
     return conn
 
 
+def _rebuild_events_table(conn: sqlite3.Connection):
+    """Copy events into a table created from _EVENTS_TABLE_SQL and swap it in."""
+    new_columns = [row[1] for row in conn.execute("PRAGMA table_info(events)")]
+    conn.execute("BEGIN")
+    try:
+        conn.execute("DROP VIEW IF EXISTS events_view")
+        conn.execute("DROP TABLE IF EXISTS events_rebuild")
+        conn.execute(_EVENTS_TABLE_SQL.format(table='events_rebuild'))
+        column_list = ', '.join(new_columns)
+        conn.execute(f"INSERT INTO events_rebuild ({column_list}) SELECT {column_list} FROM events")
+        conn.execute("DROP TABLE events")
+        conn.execute("ALTER TABLE events_rebuild RENAME TO events")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
 def ingestor_process(
     input_file: str,
     ingestion_queue: Queue,
+    ingested_ctr: Value,
     rate: int,
     run_time: int
 ):
@@ -97,6 +261,7 @@ def ingestor_process(
     Args:
         input_file: Path to log file
         ingestion_queue: Queue for raw log lines
+        ingested_ctr: Shared count of lines queued
         rate: Events per second (0 = unlimited)
         run_time: Duration to run in seconds
     """
@@ -108,58 +273,84 @@ def ingestor_process(
     batch_interval = 0.1 if rate > 0 else 0.01
     
     try:
-        with open(input_file, 'r') as f:
-            while not shutdown_event.is_set():
-                lines = []
-                for _ in range(batch_size):
-                    line = f.readline()
-                    if not line:
-                        f.seek(0)
-                        line = f.readline()
-                        if not line:
-                            break
-                    if line.strip():
-                        lines.append(line.strip())
-                
-                if not lines:
-                    break
-                
-                # Send batch
-                for line in lines:
-                    message = {
-                        'line': line,
-                        'ingested_at': datetime.now()
-                    }
-                    ingestion_queue.put(message)
-                    events_sent += 1
-                
-                # Rate limiting (batch-based)
-                if rate > 0:
-                    time.sleep(batch_interval)
+        with open(input_file, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            
+            # Replay straight from a read-only mapping: each refill slices
+            # about INGEST_WINDOW bytes up to a newline and decodes/splits
+            # them in one go, so there is no per-line file I/O
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                size = len(mm)
+                pos = 0
+                pending = []
+                taken = 0
                 
-                # Check runtime
-                if run_time > 0 and (time.time() - start_time) >= run_time:
-                    break
+                while not shutdown_event.is_set():
+                    while len(pending) - taken < batch_size:
+                        end = min(pos + INGEST_WINDOW, size)
+                        if end < size:
+                            nl = mm.rfind(b'\n', pos, end)
+                            if nl < 0:
+                                nl = mm.find(b'\n', end)
+                            end = size if nl < 0 else nl + 1
+                        chunk = mm[pos:end].decode('utf-8', 'replace').split('\n')
+                        if not chunk[-1]:
+                            chunk.pop()
+                        pending.extend(chunk)
+                        
+                        # Wrap around to the start of the file
+                        pos = end if end < size else 0
+                    
+                    lines = [line.strip() for line in pending[taken:taken + batch_size]]
+                    lines = [line for line in lines if line]
+                    taken += batch_size
+                    if taken * 2 > len(pending):
+                        del pending[:taken]
+                        taken = 0
+                    
+                    if not lines:
+                        break
+                    
+                    # Send batch as a single queue message
+                    ingested_ns = time.time_ns()
+                    ingestion_queue.put([(line, ingested_ns) for line in lines])
+                    events_sent += len(lines)
+                    with ingested_ctr.get_lock():
+                        ingested_ctr.value += len(lines)
+                    
+                    # Rate limiting (batch-based)
+                    if rate > 0:
+                        time.sleep(batch_interval)
+                    
+                    # Check runtime
+                    if run_time > 0 and (time.time() - start_time) >= run_time:
+                        break
     
     except Exception as e:
         print(f"❌ Ingestor error: {e}")
     
     finally:
+        ingestion_queue.cancel_join_thread()
         print(f"[*] Ingestor finished: {events_sent} events sent")
 
 
 def parser_worker(
     worker_id: int,
     ingestion_queue: Queue,
-    parsed_queue: Queue
+    parsed_queue: Queue,
+    dequeued_ctr: Value,
+    parsed_ctr: Value
 ):
     """
     Parse and enrich log lines.
     
     Args:
         worker_id: Worker identifier
-        ingestion_queue: Input queue with raw logs
-        parsed_queue: Output queue with parsed events
+        ingestion_queue: Input queue with batches of (line, ingested_ns)
+        parsed_queue: Output queue with Batch objects
+        dequeued_ctr: Shared count of lines taken off ingestion_queue
+        parsed_ctr: Shared count of events put on parsed_queue
     """
     print(f"[*] Parser worker {worker_id} starting")
     
@@ -168,30 +359,46 @@ def parser_worker(
     try:
         while not shutdown_event.is_set():
             try:
-                message = ingestion_queue.get(timeout=1)
-                line = message['line']
-                ingested_at = message['ingested_at']
-                
-                # Parse log line
-                event = parse_apache_log(line)
+                messages = ingestion_queue.get(timeout=1)
+                with dequeued_ctr.get_lock():
+                    dequeued_ctr.value += len(messages)
+                out_batch = Batch()
+                emitted = processed
                 
-                if event:
-                    # Enrich event
-                    event['ingested_at'] = ingested_at.isoformat()
+                for line, ingested_ns in messages:
+                    # Parse log line
+                    event = parse_apache_log(line)
+                    
+                    if not event:
+                        continue
+                    
+                    # Enrichment results go straight into the batch columns
+                    # instead of being merged into the event dict, so the
+                    # dict is never resized and dies right after append
                     
                     # IP enrichment (cached)
                     ip_data = enrich_ip(event['ip'])
-                    event.update(ip_data)
                     
-                    # User-agent enrichment
-                    ua_data = enrich_user_agent(event.get('user_agent', ''))
-                    event.update(ua_data)
+                    # User-agent enrichment (cached)
+                    ua_data = enrich_user_agent(event['user_agent'])
                     
                     # Suspicious flag
-                    event['suspicious'] = is_suspicious(event)
+                    suspicious = is_suspicious(event)
                     
-                    parsed_queue.put(event)
-                    processed += 1
+                    out_batch.append(event, ip_data, ua_data, suspicious, ingested_ns)
+                    if len(out_batch) >= PARSED_BATCH:
+                        parsed_queue.put(out_batch)
+                        processed += len(out_batch)
+                        out_batch = Batch()
+                
+                # Don't hold a partial batch back waiting for more input
+                if out_batch:
+                    parsed_queue.put(out_batch)
+                    processed += len(out_batch)
+                
+                # One counter update per input batch keeps lock traffic low
+                with parsed_ctr.get_lock():
+                    parsed_ctr.value += processed - emitted
                 
             except Exception:
                 # Queue timeout or shutdown
@@ -202,6 +409,8 @@ def parser_worker(
         print(f"❌ Parser worker {worker_id} error: {e}")
     
     finally:
+        # Don't block exit flushing events the stopped indexer will never read
+        parsed_queue.cancel_join_thread()
         print(f"[*] Parser worker {worker_id} finished: {processed} events processed")
 
 
@@ -209,52 +418,64 @@ def indexer_process(
     parsed_queue: Queue,
     db_path: str,
     batch_size: int,
-    alert_queue: Queue
+    indexed_ctr: Value,
+    alert_ctr: Value
 ):
     """
     Batch insert events into database.
     
     Args:
-        parsed_queue: Input queue with parsed events
+        parsed_queue: Input queue with Batch objects
         db_path: SQLite database path
         batch_size: Number of events per batch
-        alert_queue: Queue for alerts
+        indexed_ctr: Shared count of events taken off parsed_queue
+        alert_ctr: Shared count of alerts raised
     """
     print(f"[*] Indexer starting: batch_size={batch_size}")
     
-    conn = setup_database(db_path)
-    cursor = conn.cursor()
+    # A writer thread opens and owns the DB connection, so commits (and their
+    # WAL syncs) overlap with draining parsed_queue; SQLite releases the GIL
+    db_queue = queue.Queue(maxsize=4)
+    write_failures = {'batches': 0, 'events': 0, 'alerts': 0}
+    writer = threading.Thread(
+        target=_db_writer, args=(db_path, db_queue, write_failures), daemon=True
+    )
+    writer.start()
     
-    batch = []
+    batch = Batch()
     indexed_count = 0
     
     # For alert detection
-    error_tracking = defaultdict(lambda: deque(maxlen=100))
-    alerted_ips = {}  # Track which IPs have been alerted: {ip: last_alert_time}
-    alert_cooldown = timedelta(minutes=5)  # Don't re-alert same IP for 5 minutes
+    alert_tracker = AlertTracker(ALERT_THRESHOLD, ALERT_WINDOW_NS, ALERT_COOLDOWN_NS)
     
     try:
         while not shutdown_event.is_set():
             try:
-                event = parsed_queue.get(timeout=1)
+                events = parsed_queue.get(timeout=1)
+                with indexed_ctr.get_lock():
+                    indexed_ctr.value += len(events)
                 
-                # Add indexed timestamp
-                event['indexed_at'] = datetime.now().isoformat()
-                
-                batch.append(event)
+                # Receive time for the alert windows; the stored indexed_at
+                # columns come from SQLite's clock at insert
+                indexed_ns = time.time_ns()
                 
                 # Track errors for alerting
-                if event.get('suspicious'):
-                    error_tracking[event['ip']].append(datetime.fromisoformat(event['indexed_at']))
+                for ip, suspicious in zip(events.ips, events.suspicious):
+                    if suspicious:
+                        alert_tracker.record(ip, indexed_ns)
+                
+                batch.extend(events)
                 
                 # Flush batch
                 if len(batch) >= batch_size:
-                    _flush_batch(cursor, conn, batch)
+                    db_queue.put(batch)
                     indexed_count += len(batch)
-                    batch.clear()
+                    batch = Batch()
                     
                     # Check for alerts (with deduplication)
-                    _check_alerts(error_tracking, alert_queue, cursor, conn, alerted_ips, alert_cooldown)
+                    now_ns = time.time_ns()
+                    for ip, recent_errors in alert_tracker.due(now_ns):
+                        _raise_alert(ip, recent_errors, now_ns, alert_ctr, db_queue)
             
             except Exception:
                 # Queue timeout or shutdown
@@ -265,87 +486,127 @@ def indexer_process(
         print(f"❌ Indexer error: {e}")
     
     finally:
-        # Flush remaining batch
+        # Flush remaining batch and wait for the writer to finish
         if batch:
-            _flush_batch(cursor, conn, batch)
+            db_queue.put(batch)
             indexed_count += len(batch)
+        db_queue.put(None)
+        writer.join(timeout=WRITER_JOIN_TIMEOUT)
+        if writer.is_alive():
+            print(f"[WARNING] Indexer writer still busy after {WRITER_JOIN_TIMEOUT}s")
         
-        conn.close()
-        print(f"[*] Indexer finished: {indexed_count} events indexed")
-
-
-def _flush_batch(cursor, conn, batch: List[Dict]):
-    """Insert batch of events into database."""
-    cursor.executemany(
-        """INSERT INTO events 
-           (ip, timestamp, method, url, status, bytes, referer, user_agent, 
-            browser, os, ip_class, suspicious, ingested_at, indexed_at)
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-        [
-            (
-                e['ip'], e['timestamp'].isoformat(), e.get('method', ''),
-                e.get('url', ''), e.get('status', 0), e.get('bytes', 0),
-                e.get('referer', ''), e.get('user_agent', ''),
-                e.get('browser', ''), e.get('os', ''),
-                e.get('ip_class', ''), e.get('suspicious', False),
-                e['ingested_at'], e['indexed_at']
-            )
-            for e in batch
-        ]
-    )
-    conn.commit()
+        if any(write_failures.values()):
+            print(f"❌ Indexer write failures: {write_failures['events']} events in "
+                  f"{write_failures['batches']} batches, {write_failures['alerts']} alerts")
+        print(f"[*] Indexer finished: {indexed_count - write_failures['events']} events indexed")
 
 
-def _check_alerts(error_tracking: Dict, alert_queue: Queue, cursor, conn, 
-                  alerted_ips: Dict, alert_cooldown: timedelta):
+def _db_writer(db_path: str, db_queue: queue.Queue, failures: Dict[str, int]):
     """
-    Check for alert conditions and create alerts.
-    NOW WITH DEDUPLICATION - won't spam duplicate alerts!
+    Write Batch objects and alert dicts from db_queue until None arrives.
+    
+    Runs on its own thread with its own connection. Failed writes are
+    rolled back, reported and tallied in failures; the queue keeps being
+    drained (even if the database can't be opened) so the indexer never
+    blocks on it.
     """
-    now = datetime.now()
-    window = timedelta(seconds=60)
+    try:
+        conn = setup_database(db_path)
+    except Exception as e:
+        print(f"❌ Indexer writer could not open {db_path}: {e}")
+        conn = None
+    cursor = conn.cursor() if conn else None
     
-    for ip, timestamps in error_tracking.items():
-        # Count errors in last 60 seconds
-        recent_errors = sum(1 for ts in timestamps if now - ts <= window)
-        
-        if recent_errors >= 5:
-            # Check if we already alerted this IP recently
-            last_alert = alerted_ips.get(ip)
-            
-            if last_alert is None or (now - last_alert) >= alert_cooldown:
-                # Create new alert (not a duplicate)
-                alert = {
-                    'alert_type': 'HIGH_ERROR_RATE',
-                    'ip': ip,
-                    'count': recent_errors,
-                    'window_start': (now - window).isoformat(),
-                    'window_end': now.isoformat(),
-                    'created_at': now.isoformat()
-                }
-                
-                # Insert alert
-                cursor.execute(
-                    """INSERT INTO alerts 
-                       (alert_type, ip, count, window_start, window_end, created_at)
-                       VALUES (?, ?, ?, ?, ?, ?)""",
-                    (alert['alert_type'], alert['ip'], alert['count'],
-                     alert['window_start'], alert['window_end'], alert['created_at'])
-                )
-                conn.commit()
-                
-                alert_queue.put(alert)
-                
-                # Mark this IP as alerted
-                alerted_ips[ip] = now
-                
-                print(f"🚨 ALERT: {ip} - {recent_errors} suspicious events in 60s window")
+    try:
+        while True:
+            item = db_queue.get()
+            if item is None:
+                break
+            is_batch = isinstance(item, Batch)
+            try:
+                if cursor is None:
+                    raise sqlite3.OperationalError("no database connection")
+                if is_batch:
+                    _flush_batch(cursor, conn, item)
+                else:
+                    _insert_alert(cursor, item)
+            except Exception as e:
+                if is_batch:
+                    failures['batches'] += 1
+                    failures['events'] += len(item)
+                    print(f"❌ Indexer writer error: dropped batch of {len(item)} events: {e}")
+                else:
+                    failures['alerts'] += 1
+                    print(f"❌ Indexer writer error: dropped alert for {item['ip']}: {e}")
+    finally:
+        if conn:
+            conn.close()
+
+
+def _flush_batch(cursor, conn, batch: Batch):
+    """Insert batch of events into database.
+
+    Events carry epoch-ns ints; ingested ISO strings and ms are derived here.
+    indexed_at and indexed_at_ms are left to their column DEFAULTs, which
+    read the same 'now' for a row (SQLite's clock at insert).
+    """
+    fromtimestamp = datetime.fromtimestamp
+    rows = zip(
+        batch.ips, batch.timestamps, batch.methods, batch.urls,
+        batch.statuses, batch.bytes_sent, batch.referers, batch.user_agents,
+        batch.browsers, batch.oses, batch.ip_classes, batch.suspicious,
+        [fromtimestamp(ns / 1e9).isoformat() for ns in batch.ingested_ns],
+        [ns // 1_000_000 for ns in batch.ingested_ns],
+    )
+    
+    cursor.execute("BEGIN")
+    try:
+        cursor.executemany(_INSERT_SQL, rows)
+        conn.commit()
+    except Exception:
+        # Close the transaction so the next batch can BEGIN again
+        conn.rollback()
+        raise
+
+
+def _insert_alert(cursor, alert: Dict):
+    """Insert one alert row (autocommit)."""
+    cursor.execute(
+        """INSERT INTO alerts 
+           (alert_type, ip, count, window_start, window_end, created_at)
+           VALUES (?, ?, ?, ?, ?, ?)""",
+        (alert['alert_type'], alert['ip'], alert['count'],
+         alert['window_start'], alert['window_end'], alert['created_at'])
+    )
+
+
+def _raise_alert(ip: str, recent_errors: int, now_ns: int, alert_ctr: Value,
+                 db_queue: queue.Queue):
+    """
+    Record an alert for an IP over the error threshold.
+    Deduplication (cooldown) is handled by AlertTracker.due().
+    """
+    now = datetime.fromtimestamp(now_ns / 1e9)
+    alert = {
+        'alert_type': 'HIGH_ERROR_RATE',
+        'ip': ip,
+        'count': recent_errors,
+        'window_start': (now - timedelta(seconds=60)).isoformat(),
+        'window_end': now.isoformat(),
+        'created_at': now.isoformat()
+    }
+    
+    # Insert alert (via the writer thread)
+    db_queue.put(alert)
+    
+    with alert_ctr.get_lock():
+        alert_ctr.value += 1
+    
+    print(f"🚨 ALERT: {ip} - {recent_errors} suspicious events in 60s window")
 
 
 def metrics_collector(
-    ingestion_queue: Queue,
-    parsed_queue: Queue,
-    alert_queue: Queue,
+    counters: Dict[str, Value],
     metrics_file: str,
     interval: int = 5
 ):
@@ -353,9 +614,8 @@ def metrics_collector(
     Collect and persist metrics.
     
     Args:
-        ingestion_queue: Ingestion queue for size monitoring
-        parsed_queue: Parsed queue for size monitoring
-        alert_queue: Alert queue for count tracking
+        counters: Shared pipeline counters (see main); queue sizes are
+            derived from them, so sampling needs no queue calls
         metrics_file: Output CSV file
         interval: Collection interval in seconds
     """
@@ -363,8 +623,6 @@ def metrics_collector(
     
     process = psutil.Process()
     start_time = time.time()
-    last_event_count = 0
-    alerts_count = 0
     
     with open(metrics_file, 'w', newline='') as f:
         writer = csv.writer(f)
@@ -383,19 +641,17 @@ def metrics_collector(
                 cpu = process.cpu_percent(interval=0.1)
                 memory = process.memory_info().rss / 1024 / 1024  # MB
                 
-                ingestion_size = ingestion_queue.qsize() if hasattr(ingestion_queue, 'qsize') else 0
-                parsed_size = parsed_queue.qsize() if hasattr(parsed_queue, 'qsize') else 0
-                
-                # Drain alert queue
-                while not alert_queue.empty():
-                    try:
-                        alert_queue.get_nowait()
-                        alerts_count += 1
-                    except:
-                        break
+                # Read the raw ctypes values: Synchronized.value would take
+                # each counter's lock, which writers only need for +=
+                ingested, dequeued, parsed, indexed, alerts_count = (
+                    counters[name].get_obj().value
+                    for name in ('ingested', 'dequeued', 'parsed', 'indexed', 'alerts')
+                )
+                ingestion_size = ingested - dequeued
+                parsed_size = parsed - indexed
                 
-                # Calculate throughput (approximate)
-                current_count = last_event_count + parsed_size
+                # Calculate throughput
+                current_count = indexed
                 throughput = current_count / runtime if runtime > 0 else 0
                 
                 writer.writerow([
@@ -455,11 +711,17 @@ def main():
     print(f"Metrics: {args.metrics}")
     print("="*60)
     
-    # Create queues (bounded to prevent memory issues)
-    manager = Manager()
-    ingestion_queue = manager.Queue(maxsize=args.workers * 100)
-    parsed_queue = manager.Queue(maxsize=args.batch * 10)
-    alert_queue = manager.Queue()
+    # Create queues (bounded to prevent memory issues). Plain pipe-backed
+    # queues: Manager proxies add a round trip through the server process per op.
+    # Items are batches, so bounds are sized to keep roughly the same event backlog
+    ingestion_queue = Queue(maxsize=max(2, args.workers))
+    parsed_queue = Queue(maxsize=max(2, args.batch * 10 // PARSED_BATCH))
+    
+    # Shared event counters for metrics, updated once per batch by each stage
+    counters = {
+        name: Value('q', 0)
+        for name in ('ingested', 'dequeued', 'parsed', 'indexed', 'alerts')
+    }
     
     # Start processes
     processes = []
@@ -467,7 +729,7 @@ def main():
     # Ingestor
     p_ingestor = Process(
         target=ingestor_process,
-        args=(args.input, ingestion_queue, args.rate, args.run_time)
+        args=(args.input, ingestion_queue, counters['ingested'], args.rate, args.run_time)
     )
     p_ingestor.start()
     processes.append(p_ingestor)
@@ -476,7 +738,7 @@ def main():
     for i in range(args.workers):
         p = Process(
             target=parser_worker,
-            args=(i, ingestion_queue, parsed_queue)
+            args=(i, ingestion_queue, parsed_queue, counters['dequeued'], counters['parsed'])
         )
         p.start()
         processes.append(p)
@@ -484,7 +746,7 @@ def main():
     # Indexer
     p_indexer = Process(
         target=indexer_process,
-        args=(parsed_queue, args.db, args.batch, alert_queue)
+        args=(parsed_queue, args.db, args.batch, counters['indexed'], counters['alerts'])
     )
     p_indexer.start()
     processes.append(p_indexer)
@@ -492,7 +754,7 @@ def main():
     # Metrics collector
     p_metrics = Process(
         target=metrics_collector,
-        args=(ingestion_queue, parsed_queue, alert_queue, args.metrics)
+        args=(counters, args.metrics)
     )
     p_metrics.start()
     processes.append(p_metrics)
@@ -554,11 +816,11 @@ def main():
     # Latency statistics
     cursor.execute("""
         SELECT 
-            AVG((julianday(indexed_at) - julianday(ingested_at)) * 86400000) as avg_latency_ms,
-            MIN((julianday(indexed_at) - julianday(ingested_at)) * 86400000) as min_latency_ms,
-            MAX((julianday(indexed_at) - julianday(ingested_at)) * 86400000) as max_latency_ms
+            AVG(indexed_at_ms - ingested_at_ms) as avg_latency_ms,
+            MIN(indexed_at_ms - ingested_at_ms) as min_latency_ms,
+            MAX(indexed_at_ms - ingested_at_ms) as max_latency_ms
         FROM events
-        WHERE indexed_at IS NOT NULL
+        WHERE indexed_at_ms IS NOT NULL
     """)
     
     latency_stats = cursor.fetchone()
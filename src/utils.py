@@ -1,9 +1,126 @@
 import re
+from collections import defaultdict, deque
 from datetime import datetime
-from typing import Dict, Optional, Tuple, Any
+from typing import DefaultDict, Deque, Dict, List, Optional, Set, Tuple, Any
 from functools import lru_cache
 
 
+# Apache error/notice log format: [timestamp] [level] [context] message
+ERROR_RE = re.compile(r'^\[([\w\s:/\+\-]+)\] \[(\w+)\](?: \[([^\]]+)\])? (.+)$')
+
+# Apache Combined Log Format: IP - - [timestamp] "METHOD /path HTTP/1.1" status bytes "referer" "user-agent"
+CLF_RE = re.compile(r'^(\S+) \S+ \S+ \[([\w:/]+ [+\-]\d{4})\] "(\S+) (\S+) \S+" (\d{3}) (\S+)(?: "([^"]*)" "([^"]*)")?')
+
+# Client address inside an error line's context, e.g. [client 10.0.0.1]
+CLIENT_IP_RE = re.compile(r'client ([\d.]+)')
+
+# Month/weekday abbreviations for the fixed-layout timestamp fast paths
+_MONTHS = {
+    'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
+    'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12,
+}
+_WEEKDAYS = frozenset(('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'))
+
+# Lowercase URL substrings flagged by is_suspicious
+ATTACK_PATTERNS = (
+    '../',  # Path traversal
+    'script>',  # XSS
+    'union select',  # SQL injection
+    '/etc/passwd',  # File inclusion
+    'cmd=',  # Command injection
+)
+
+
+def _clf_time(s: str) -> datetime:
+    """
+    Parse a CLF timestamp such as '01/Jul/1995:00:00:01'.
+
+    Slices the canonical layout directly, which is several times faster
+    than strptime; anything else goes through strptime, so results and
+    ValueErrors are identical.
+    """
+    month = _MONTHS.get(s[3:6])
+    if (month and len(s) == 20 and s.isascii()
+            and s[2] == '/' and s[6] == '/' and s[11] == ':' and s[14] == ':' and s[17] == ':'
+            and (s[0:2] + s[7:11] + s[12:14] + s[15:17] + s[18:20]).isdigit()):
+        return datetime(int(s[7:11]), month, int(s[0:2]),
+                        int(s[12:14]), int(s[15:17]), int(s[18:20]))
+    return datetime.strptime(s, '%d/%b/%Y:%H:%M:%S')
+
+
+def _error_time(s: str) -> datetime:
+    """
+    Parse an error-log timestamp such as 'Sun Dec 04 04:47:44 2005'.
+
+    Same fast path / strptime fallback scheme as _clf_time.
+    """
+    month = _MONTHS.get(s[4:7])
+    if (month and len(s) == 24 and s.isascii() and s[0:3] in _WEEKDAYS
+            and s[3] == ' ' and s[7] == ' ' and s[10] == ' ' and s[19] == ' '
+            and s[13] == ':' and s[16] == ':'
+            and (s[8:10] + s[11:13] + s[14:16] + s[17:19] + s[20:24]).isdigit()):
+        return datetime(int(s[20:24]), month, int(s[8:10]),
+                        int(s[11:13]), int(s[14:16]), int(s[17:19]))
+    return datetime.strptime(s, '%a %b %d %H:%M:%S %Y')
+
+
+def _parse_error(line: str) -> Optional[Dict[str, Any]]:
+    """Parse an error/notice line: [timestamp] [level] [context] message."""
+    match = ERROR_RE.match(line)
+    if not match:
+        return None
+    
+    timestamp_str, level, context, message = match.groups()
+    try:
+        timestamp = _error_time(timestamp_str)
+    except ValueError:
+        timestamp = datetime.now()
+    
+    # Extract IP from context if present
+    ip_match = CLIENT_IP_RE.search(context or '')
+    ip = ip_match.group(1) if ip_match else ''
+    
+    return {
+        'ip': ip,
+        'timestamp': timestamp,
+        'method': 'LOG',
+        'url': message[:100],
+        'status': 400 if level == 'error' else 200,
+        'bytes': 0,
+        'referer': context or '',
+        'user_agent': level,
+    }
+
+
+def _parse_clf(line: str) -> Optional[Dict[str, Any]]:
+    """Parse a Combined Log Format request line."""
+    match = CLF_RE.match(line)
+    if not match:
+        return None
+    
+    ip, timestamp_str, method, url, status, bytes_sent, referer, user_agent = match.groups()
+    try:
+        timestamp = _clf_time(timestamp_str.split()[0])
+    except ValueError:
+        timestamp = datetime.now()
+    
+    try:
+        size = int(bytes_sent) if bytes_sent != '-' else 0
+    except ValueError:
+        size = 0
+    
+    return {
+        'ip': ip,
+        'timestamp': timestamp,
+        'method': method,
+        'url': url,
+        'status': int(status),
+        'bytes': size,
+        'referer': referer if referer else '',
+        'user_agent': user_agent if user_agent else '',
+    }
+
+
 def parse_apache_log(line: str) -> Optional[Dict[str, Any]]:
     """
     Parse Apache log lines (both error/notice and request formats).
@@ -22,62 +139,18 @@ def parse_apache_log(line: str) -> Optional[Dict[str, Any]]:
     if not line:
         return None
     
-    # Try Apache error/notice log format: [timestamp] [level] [context] message
-    error_pattern = r'^\[([\w\s:/\+\-]+)\] \[(\w+)\](?:\s\[([^\]]+)\])?\s(.+)$'
-    match = re.match(error_pattern, line)
-    if match:
-        timestamp_str, level, context, message = match.groups()
-        try:
-            timestamp = datetime.strptime(timestamp_str, '%a %b %d %H:%M:%S %Y')
-        except ValueError:
-            timestamp = datetime.now()
-        
-        # Extract IP from context if present
-        ip_match = re.search(r'client\s([\d\.]+)', context or '')
-        ip = ip_match.group(1) if ip_match else ''
-        
-        return {
-            'ip': ip,
-            'timestamp': timestamp,
-            'method': 'LOG',
-            'url': message[:100],
-            'status': 400 if level == 'error' else 200,
-            'bytes': 0,
-            'referer': context or '',
-            'user_agent': level,
-        }
+    # Error/notice lines start with '[timestamp]'; request lines start with
+    # the client IP, so skip the error regex for them
+    if line[0] == '[':
+        event = _parse_error(line)
+        if event:
+            return event
     
-    # Try Apache Combined Log Format: IP - - [timestamp] "METHOD /path HTTP/1.1" status bytes "referer" "user-agent"
-    clf_pattern = r'^(\S+) \S+ \S+ \[([\w:/]+\s[+\-]\d{4})\] "(\S+) (\S+) \S+" (\d{3}) (\S+)(?: "([^"]*)" "([^"]*)")?'
-    match = re.match(clf_pattern, line)
-    if match:
-        ip, timestamp_str, method, url, status, bytes_sent, referer, user_agent = match.groups()
-        try:
-            timestamp = datetime.strptime(timestamp_str.split()[0], '%d/%b/%Y:%H:%M:%S')
-        except ValueError:
-            timestamp = datetime.now()
-        
-        try:
-            bytes_sent = int(bytes_sent) if bytes_sent != '-' else 0
-        except ValueError:
-            bytes_sent = 0
-        
-        return {
-            'ip': ip,
-            'timestamp': timestamp,
-            'method': method,
-            'url': url,
-            'status': int(status),
-            'bytes': bytes_sent,
-            'referer': referer if referer else '',
-            'user_agent': user_agent if user_agent else '',
-        }
-    
-    return None
+    return _parse_clf(line)
 
 
 @lru_cache(maxsize=10000)
-def enrich_ip(ip: str) -> Dict[str, str]:
+def enrich_ip(ip: str) -> Dict[str, Any]:
     """
     Lightweight IP enrichment with caching.
 
@@ -99,9 +172,14 @@ def enrich_ip(ip: str) -> Dict[str, str]:
         return {'ip_class': 'public', 'suspicious': False}
 
 
+@lru_cache(maxsize=65536)
 def enrich_user_agent(user_agent: str) -> Dict[str, Any]:
     """
-    Simple user-agent enrichment.
+    Simple user-agent enrichment with caching.
+
+    Real traffic repeats a small set of user-agent strings, so results are
+    cached like enrich_ip. The returned dict is shared between calls and
+    must not be mutated.
 
     Args:
         user_agent: User-Agent string
@@ -160,15 +238,59 @@ def is_suspicious(event: Dict[str, Any]) -> bool:
     
     # Common attack patterns
     url = event.get('url', '').lower()
-    attack_patterns = [
-        '../',  # Path traversal
-        'script>',  # XSS
-        'union select',  # SQL injection
-        '/etc/passwd',  # File inclusion
-        'cmd=',  # Command injection
-    ]
+    for pattern in ATTACK_PATTERNS:
+        if pattern in url:
+            return True
     
-    return any(pattern in url for pattern in attack_patterns)
+    return False
+
+
+class AlertTracker:
+    """
+    Per-IP sliding-window counts of suspicious events, with alert cooldown.
+
+    record() is O(1) amortized per event: entries older than the window
+    are dropped from the left of the IP's deque as new ones arrive, and
+    IPs reaching the threshold are remembered. due() is called at batch
+    boundaries and returns the (ip, in-window count) pairs to alert on,
+    skipping IPs alerted within the cooldown. Timestamps are epoch ns.
+    """
+
+    def __init__(self, threshold: int, window_ns: int, cooldown_ns: int, maxlen: int = 100) -> None:
+        self.threshold = threshold
+        self.window_ns = window_ns
+        self.cooldown_ns = cooldown_ns
+        self.events: DefaultDict[str, Deque[int]] = defaultdict(lambda: deque(maxlen=maxlen))
+        self.last_alert: Dict[str, int] = {}  # {ip: ns of last alert}
+        self.pending: Set[str] = set()  # IPs that reached the threshold since the last due()
+
+    def _prune(self, timestamps: Deque[int], now_ns: int) -> None:
+        cutoff = now_ns - self.window_ns
+        while timestamps and timestamps[0] < cutoff:
+            timestamps.popleft()
+
+    def record(self, ip: str, now_ns: int) -> None:
+        """Record one suspicious event for ip."""
+        timestamps = self.events[ip]
+        timestamps.append(now_ns)
+        self._prune(timestamps, now_ns)
+        if len(timestamps) >= self.threshold:
+            self.pending.add(ip)
+
+    def due(self, now_ns: int) -> List[Tuple[str, int]]:
+        """Return (ip, count) for IPs over the threshold and out of cooldown."""
+        alerts = []
+        for ip in self.pending:
+            timestamps = self.events[ip]
+            self._prune(timestamps, now_ns)
+            if len(timestamps) < self.threshold:
+                continue
+            last = self.last_alert.get(ip)
+            if last is None or now_ns - last >= self.cooldown_ns:
+                self.last_alert[ip] = now_ns
+                alerts.append((ip, len(timestamps)))
+        self.pending.clear()
+        return alerts
 
 
 def format_metrics_row(metrics: Dict[str, Any]) -> str:
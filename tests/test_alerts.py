@@ -0,0 +1,89 @@
+import pytest
+from src.utils import AlertTracker
+
+
+SECOND = 1_000_000_000
+
+
+def make_tracker():
+    return AlertTracker(threshold=5, window_ns=60 * SECOND, cooldown_ns=300 * SECOND)
+
+
+def test_alert_fires_at_threshold():
+    """Test that an IP alerts once it reaches the threshold."""
+    tracker = make_tracker()
+    
+    for i in range(4):
+        tracker.record('1.2.3.4', i * SECOND)
+    assert tracker.due(4 * SECOND) == []
+    
+    tracker.record('1.2.3.4', 4 * SECOND)
+    assert tracker.due(4 * SECOND) == [('1.2.3.4', 5)]
+
+
+def test_alert_count_at_batch_boundary():
+    """Test that the alert reports every in-window event seen before due()."""
+    tracker = make_tracker()
+    
+    for i in range(8):
+        tracker.record('1.2.3.4', i * SECOND)
+    
+    assert tracker.due(8 * SECOND) == [('1.2.3.4', 8)]
+
+
+def test_old_entries_leave_window():
+    """Test that events older than the window no longer count."""
+    tracker = make_tracker()
+    
+    for i in range(4):
+        tracker.record('1.2.3.4', i * SECOND)
+    
+    # 61s later the first four have expired
+    tracker.record('1.2.3.4', 65 * SECOND)
+    assert tracker.due(65 * SECOND) == []
+    assert len(tracker.events['1.2.3.4']) == 1
+
+
+def test_window_expires_before_due():
+    """Test that an IP over the threshold is dropped if its events expire before due()."""
+    tracker = make_tracker()
+    
+    for i in range(5):
+        tracker.record('1.2.3.4', i * SECOND)
+    
+    assert tracker.due(120 * SECOND) == []
+
+
+def test_cooldown_suppresses_repeat_alerts():
+    """Test that an alerted IP is not re-alerted until the cooldown passes."""
+    tracker = make_tracker()
+    
+    for i in range(5):
+        tracker.record('1.2.3.4', i * SECOND)
+    assert tracker.due(5 * SECOND) == [('1.2.3.4', 5)]
+    
+    # Still over the threshold, but within the cooldown
+    tracker.record('1.2.3.4', 6 * SECOND)
+    assert tracker.due(6 * SECOND) == []
+    
+    # After the cooldown a fresh burst alerts again
+    for i in range(5):
+        tracker.record('1.2.3.4', (310 + i) * SECOND)
+    assert tracker.due(315 * SECOND) == [('1.2.3.4', 5)]
+
+
+def test_cooldown_is_per_ip():
+    """Test that one IP's cooldown doesn't suppress another IP."""
+    tracker = make_tracker()
+    
+    for i in range(5):
+        tracker.record('1.2.3.4', i * SECOND)
+    tracker.due(5 * SECOND)
+    
+    for i in range(5):
+        tracker.record('5.6.7.8', (10 + i) * SECOND)
+    assert tracker.due(15 * SECOND) == [('5.6.7.8', 5)]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -88,6 +88,20 @@ def test_enrich_user_agent_chrome():
     assert result['os'] == 'macOS'
 
 
+def test_enrich_user_agent_caching():
+    """Test that user-agent enrichment is cached."""
+    ua = 'Mozilla/5.0 (X11; Linux x86_64) Gecko/20100101 Firefox/115.0'
+    
+    result1 = enrich_user_agent(ua)
+    hits = enrich_user_agent.cache_info().hits
+    
+    # Second call should return cached result
+    result2 = enrich_user_agent(ua)
+    
+    assert result1 == result2
+    assert enrich_user_agent.cache_info().hits == hits + 1
+
+
 def test_is_suspicious_error_status():
     """Test suspicious detection for error status."""
     event = {'status': 404, 'url': '/index.html'}
@@ -121,5 +135,17 @@ def test_parse_apache_log_timestamp():
     assert event['timestamp'].day == 1
 
 
+def test_parse_apache_log_timestamp_matches_strptime():
+    """Test that the fast timestamp parsing agrees with strptime."""
+    line = '10.0.0.1 - - [01/Jul/1995:00:00:01 -0400] "GET / HTTP/1.0" 200 100 "-" "-"'
+    error_line = '[Sun Dec 04 04:47:44 2005] [error] [client 10.0.0.1] File does not exist'
+    
+    event = parse_apache_log(line)
+    error_event = parse_apache_log(error_line)
+    
+    assert event['timestamp'] == datetime.strptime('01/Jul/1995:00:00:01', '%d/%b/%Y:%H:%M:%S')
+    assert error_event['timestamp'] == datetime.strptime('Sun Dec 04 04:47:44 2005', '%a %b %d %H:%M:%S %Y')
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
\ No newline at end of file